@@ -1,212 +1,131 @@
 # Libraries
-from haversine import haversine
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import re
-import datetime as dt
-from PIL import Image
-import inflection
-import io
-import base64
-import pydeck as pdk
-
-# Libs necessárias
-import pandas as pd
-import numpy as np
 import streamlit as st
-import folium
-from streamlit_folium import folium_static
-from folium.plugins import MarkerCluster
+
+from utils.assets import logo_src
+from utils.cache import cached
+from utils.data import load_data
+from utils.density import RESOLUTIONS, density_cells, load_density
+from utils.maps import MAP_BACKENDS, START_LOCATION, START_ZOOM, cluster_layer, deck_map, density_deck, covers, nearby_layer, pad_bounds, parse_bounds
+from utils.filters import load_filter_index, present_values, row_mask, select_rows
+from utils.profiler import finish_run, stage, start_run, timed
+from utils.search import load_search_index, search
+from utils.spatial import load_index, nearest, within_bounds, within_radius
 
 st.set_page_config(
     page_title='Main Page',    
     layout= 'wide'
 )
 
-# rodar o streamlit no cmd: python -m streamlit run Home.py
-
-# ====================================================================
-# FUNCTIONS
-# ====================================================================
+# Perfil da execução (tempo, linhas e memória por etapa), só com FOME_ZERO_PROFILE=1
+run = start_run('Home')
 
-def clean_code(df):
-    """
-    FUNÇÃO DE DATA CLEANSING:  
-    1. EXCLUSÃO LINHAS NAN
-   
-    INPUT: DATAFRAME
-    OUTPUT: DATAFRAME
-    """
-    # Substituir 'Nan ' por np.nan usando lambda
-    df = df.applymap(lambda x: np.nan if x == 'Nan ' else x)
-
-    # Excluir linhas contendo np.nan
-    df.dropna(inplace=True)
-  
-    return df
+# rodar o streamlit no cmd: python -m streamlit run Home.py
 
 # ====================================================================
 # IMPORT DATASET
 # ====================================================================
-df = pd.read_csv("dataset/zomato.csv")
 
-# rodar o streamlit no cmd: python -m streamlit run cities.py
-# identar automaticamente: shift + alt + L
-
-# ====================================================================
-# DATA CLEANSING
-# ====================================================================
-df = clean_code(df)
-
-# ====================================================================
-# MODELAGEM DATASET
-# ====================================================================
+# Dataset preparado uma única vez por processo (cache pelo mtime/tamanho do CSV)
+df = timed('load_data', load_data)
 
-# Nome dos países e coluna
-countries = {
-1: "India",
-14: "Australia",
-30: "Brazil",
-37: "Canada",
-94: "Indonesia",
-148: "New Zeland",
-162: "Philippines",
-166: "Qatar",
-184: "Singapure",
-189: "South Africa",
-191: "Sri Lanka",
-208: "Turkey",
-214: "United Arab Emirates",
-215: "England",
-216: "United States of America",
-}
-
-def country_name(country_id):
-    return countries[country_id]
-
-# Criando uma coluna com base no country code
-df['Country'] = df['Country Code'].map(country_name)
-
-# Tipo de Categoria de Comida e Coluna
-
-def create_price_type(price_range):
-    if price_range == 1:
-        return "cheap"
-    elif price_range == 2:
-        return "normal"
-    elif price_range == 3:
-        return "expensive"
-    else:
-        return "gourmet"
-
-df['Price_type'] = df['Price range'].map(create_price_type)
-
-# Renomear as colunas do df
-
-def rename_columns(dataframe):
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    return df
-
-df = rename_columns(df)
-
-#Remoção valor Outlier
-index_max = df['average_cost_for_two'].idxmax()
-print(df.loc[index_max])
-df.drop(index_max, inplace=True)
-
-#Conversão de valores para Dólar:
-exchange_rates = {
-    'Dollar($)': 1,
-    'Brazilian Real(R$)': 4.95,
-    'Indonesian Rupiah(IDR)': 14300,
-    'Sri Lankan Rupee(LKR)': 200,
-    'Botswana Pula(P)': 11,
-    'Indian Rupees(Rs.)': 75,
-    'Rand(R)': 15,
-    'Qatari Rial(QR)': 3.64,
-    'Emirati Diram(AED)': 3.67,
-    'Turkish Lira(TL)': 8.5,
-    'Pounds(£)': 0.73,
-    'NewZealand($)': 1.4
-}
-
-# Convertendo os valores
-df['avg_cost_for_two_dol'] = df.apply(lambda row: row['average_cost_for_two'] / exchange_rates[row['currency']], axis=1)
-
-# Arredondando os valores para 2 casas decimais
-df['avg_cost_for_two_dol'] = df['avg_cost_for_two_dol'].round(2)
-
-# Crie a coluna 'main_cuisine' pegando apenas o primeiro valor (até a primeira vírgula) da coluna 'cuisines'
-df['main_cuisine'] = df['cuisines'].str.split(',').str[0]
+# Linhas de cada valor das colunas filtráveis: os filtros da sidebar viram interseções de listas
+filter_index = timed('load_filter_index', load_filter_index)
 
 # ====================================================================
 # MAP FUNCTION
 # ====================================================================
 
-def display_map(df):
+def display_map(mask, filters):
+    # Importados só quando um mapa folium é exibido (o modo Pydeck não paga esse custo)
+    import folium
+    from streamlit_folium import st_folium
+
+    # Zoom e área visível da última interação com o mapa (None na primeira renderização)
+    view = st.session_state.get('restaurants_map') or {}
+    zoom = view.get('zoom') or START_ZOOM
+    bounds = parse_bounds(view.get('bounds'))
+
+    # A camada só é refeita quando a área visível sai da área já carregada,
+    # o zoom muda ou os filtros mudam; arrastos pequenos reaproveitam a anterior
+    loaded = st.session_state.get('restaurants_map_loaded')
+    if (loaded is None or loaded['zoom'] != zoom or loaded['filters'] != filters
+            or not covers(loaded['bounds'], bounds)):
+        region = pad_bounds(bounds)
+        full = load_data()
+        rows = within_bounds(load_index(), region, mask)
+        loaded = {'zoom': zoom, 'filters': filters, 'bounds': region,
+                  'layer': cluster_layer(full.iloc[rows], zoom)}
+        st.session_state['restaurants_map_loaded'] = loaded
 
 # Mapa inicial
-    m = folium.Map(location=[20, 0], zoom_start=2)
-    marker_cluster = MarkerCluster().add_to(m)
-    
-    # Mapeamento de cores
-    colors = {
-        "cheap": "lightgreen",
-        "normal": "blue",
-        "expensive": "orange",
-        "gourmet": "darkred"
-    }
-
-    for _, row in df.iterrows():
-        popup_content = f"""
-        <div style="width:250px;">
-            <strong>{row['restaurant_name']}</strong><br>
-            Price: {row['average_cost_for_two']} ({row['currency']}) for two<br>
-            Type: {row['main_cuisine']}<br>
-            Rating: {row['aggregate_rating']}/5.0<br>
-            Price Type: {row['price_type']}
-        </div>
-        """
-        folium.Marker(
-            location=[row['latitude'], row['longitude']],
-            popup=popup_content,
-            icon=folium.Icon(color=colors.get(row['price_type'], "blue"), icon='home', prefix='glyphicon')
-        ).add_to(marker_cluster)
- 
+    m = folium.Map(location=START_LOCATION, zoom_start=START_ZOOM)
+
+    # Clusters calculados no servidor para o zoom/área carregados; a camada é
+    # trocada no mapa já carregado, sem recarregar o mapa base
+    layer = loaded['layer']
+
     # Controlando a exibição do mapa (centralizado)
     col1, col2, col3 = st.columns([1,2,1])  # Ajustando a proporção das colunas
     with col2:
-        folium_static(m)
-        
-# ====================================================================
-# SIDEBAR LOGO
-# ====================================================================
+        st_folium(m, key='restaurants_map', width=700, height=500,
+                  feature_group_to_add=layer, returned_objects=['zoom', 'bounds'])
+
+def display_nearby_map(df, mask):
+    import folium
+    from streamlit_folium import st_folium
+
+    # Ponto da busca: último clique no mapa ou, antes do primeiro clique, o restaurante filtrado mais votado
+    clicked = (st.session_state.get('nearby_map') or {}).get('last_clicked')
+    if clicked:
+        point = (clicked['lat'], clicked['lng'])
+    elif df.empty:
+        point = tuple(START_LOCATION)
+    else:
+        top = df.loc[df['votes'].idxmax()]
+        point = (float(top['latitude']), float(top['longitude']))
 
-# Carregar a imagem
-img = plt.imread('images/cuisine_logo.png')
+    col1, col2 = st.columns(2)
+    with col1:
+        search = st.radio('Search', ['Within radius', 'Nearest'], horizontal=True)
+    with col2:
+        if search == 'Within radius':
+            radius_km = st.slider('Radius (km)', 1, 50, 5)
+        else:
+            k = st.slider('Number of restaurants', 1, 50, 10)
+
+    # Índice espacial do dataset completo; os filtros da sidebar entram como máscara
+    full = load_data()
+    if search == 'Within radius':
+        rows, distances = within_radius(load_index(), *point, radius_km, mask)
+        layer = nearby_layer(full.iloc[rows], point, radius_km)
+    else:
+        rows, distances = nearest(load_index(), *point, k, mask)
+        layer = nearby_layer(full.iloc[rows], point)
+
+    nearby = full.iloc[rows].assign(distance_km=distances.round(2))
+
+    m = folium.Map(location=START_LOCATION, zoom_start=START_ZOOM)
 
-# Converter a imagem para bytes
-buf = io.BytesIO()
-Image.fromarray((img * 255).astype('uint8')).save(buf, format='png')
+    col1, col2, col3 = st.columns([1,2,1])
+    with col2:
+        st.caption('Click on the map to choose the search point.')
+        st_folium(m, key='nearby_map', width=700, height=500, center=point, zoom=12,
+                  feature_group_to_add=layer, returned_objects=['last_clicked'])
 
-# Codificar a imagem em base64
-encoded_img = base64.b64encode(buf.getvalue()).decode('utf-8')
+    st.dataframe(nearby[['restaurant_name', 'city', 'main_cuisine', 'price_type', 'aggregate_rating', 'distance_km']],
+                 use_container_width=True, hide_index=True)
 
+# ====================================================================
+# SIDEBAR LOGO
+# ====================================================================
+
+# Logo processado uma vez por processo (utils.assets): arquivo estático com hash ou base64 já calculado
 # Centralizar a imagem na barra lateral usando HTML/CSS
 st.sidebar.markdown("""
     <div style="display: flex; justify-content: center;">
-        <img src="data:image/png;base64,{}" width="60"/>
+        <img src="{}" width="60"/>
     </div>
-""".format(encoded_img), unsafe_allow_html=True)
+""".format(logo_src('cuisine_logo.png')), unsafe_allow_html=True)
 
 # ====================================================================
 # SIDEBAR TITLES
@@ -245,8 +164,7 @@ country_options = st.sidebar.multiselect(
     countries, default= 'Brazil')
 
 # Countries filter
-selected_countries = df['country'].isin(country_options)
-df = df.loc[selected_countries, :]
+selected_rows = timed('filter.country', select_rows, filter_index, country=country_options)
 
 # ====================================================================
 # SIDEBAR CUISINE TYPE - MAP
@@ -259,7 +177,7 @@ st.sidebar.markdown("""
 """, unsafe_allow_html=True)
 
 # Price type list
-price_type_list = df['price_type'].unique().tolist()
+price_type_list = present_values(filter_index, 'price_type', selected_rows)
 
 # Multiple price types selection
 price_types_options = st.sidebar.multiselect(
@@ -267,24 +185,26 @@ price_types_options = st.sidebar.multiselect(
     price_type_list, default=['cheap', 'normal', 'expensive', 'gourmet'])
 
 # Cuisine filter
-selected_price_types = df['price_type'].isin(price_types_options)
-df = df.loc[selected_price_types, :]
+selected_rows = timed('filter.price_type', select_rows, filter_index, country=country_options, price_type=price_types_options)
+df = df.iloc[selected_rows]
+
+# Mesma seleção como máscara para os índices espacial e de busca
+selected_mask = timed('filter.mask', row_mask, filter_index, selected_rows)
+
+# Seleção da sidebar: chave dos resultados memoizados (utils.cache), compartilhados entre as sessões
+selection = dict(country=country_options, price_type=price_types_options)
 
 # ====================================================================
 # GITHUB LINK
 # ====================================================================
 
-def img_to_base64(path):
-    with open(path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode()
-    
 # Combine o ícone do GitHub e o link em HTML
 github_link = """
 <a href="https://github.com/fernandoper/fome_zero.git" style="display: inline-block; text-decoration: none; color: yellow;">
-    <img src="data:image/png;base64,{}" width="20" style="display: inline-block; vertical-align: middle; margin-right: 10px;">
+    <img src="{}" width="20" style="display: inline-block; vertical-align: middle; margin-right: 10px;">
     Github of this project
 </a>
-""".format(img_to_base64('images/github_logo.png'))
+""".format(logo_src('github_logo.png'))
 
 st.sidebar.markdown(github_link, unsafe_allow_html=True)
 
@@ -302,32 +222,84 @@ with st.container():
     
     st.markdown('### Platform Metrics')
     
+    metrics = timed('home.metrics', cached, 'home.metrics', lambda: {
+        'restaurants': df.loc[:, 'restaurant_name'].nunique(),
+        'countries': df.loc[:, 'country'].nunique(),
+        'cities': df.loc[:, 'city'].nunique(),
+        'votes': df.loc[:, 'votes'].sum(),
+        'cuisines': df.loc[:, 'main_cuisine'].nunique(),
+    }, **selection)
+
     col1, col2, col3, col4, col5 = st.columns(5)
 
     with col1:
-            unique_restaurants = df.loc[:, 'restaurant_name'].nunique()
+            unique_restaurants = metrics['restaurants']
             col1.metric('Number os Restaurants', unique_restaurants)
 
     with col2:
-            country_number = df.loc[:, 'country'].nunique()
+            country_number = metrics['countries']
             col2.metric('Number of Countries', country_number)
 
     with col3:
-            cities_number = df.loc[:, 'city'].nunique()
+            cities_number = metrics['cities']
             col3.metric('Number of Cities', cities_number)
 
     with col4:
-            votes_number = df.loc[:, 'votes'].sum()
+            votes_number = metrics['votes']
             formatted_votes = "{:,}".format(votes_number)
             col4.metric('Number of Votes', formatted_votes)
 
     with col5:
-            cuisine_number = df.loc[:, 'main_cuisine'].nunique()
+            cuisine_number = metrics['cuisines']
             col5.metric('Number of Cuisines', cuisine_number)
 
+# SEARCH: restaurants by name, cuisine, locality or city
+with st.container():
+
+    st.markdown('### Search Restaurants')
+
+    query = st.text_input('Search by name, cuisine, locality or city', placeholder='e.g. pizza sao paulo')
+    if query:
+        # Índice invertido do dataset completo; os filtros da sidebar entram como máscara
+        full = load_data()
+        with stage('search') as record:
+            rows, scores = search(load_search_index(), query, selected_mask)
+            record['rows'] = len(rows)
+        results = (full.iloc[rows].assign(score=scores)
+                       .sort_values(['score', 'votes'], ascending=False, kind='stable')
+                       .head(20))
+        st.caption(f'{len(rows)} restaurants found')
+        st.dataframe(results[['restaurant_name', 'cuisines', 'locality', 'city', 'aggregate_rating', 'votes']],
+                     use_container_width=True, hide_index=True)
+
 # CHART2: Map
 with st.container():
     
-    display_map(df)
+    map_backend = st.radio('Map backend', MAP_BACKENDS, horizontal=True)
+    if map_backend == 'Pydeck (WebGL)':
+        with stage('deck_map', rows=len(df)):
+            st.pydeck_chart(deck_map(df))
+    elif st.radio('Map mode', ['Clusters', 'Nearby restaurants'], horizontal=True) == 'Clusters':
+        with stage('display_map', rows=len(df)):
+            display_map(selected_mask, filters=(tuple(country_options), tuple(price_types_options)))
+    else:
+        with stage('display_nearby_map'):
+            display_nearby_map(df, selected_mask)
+
+# CHART3: Density
+with st.container():
+
+    st.markdown('### Restaurant Density')
+
+    # Células pré-agregadas por versão do dataset: o mapa não lê as linhas
+    cell_deg = st.select_slider('Cell size (degrees)', options=RESOLUTIONS, value=1)
+    cells = timed('home.density', cached, 'home.density',
+                  lambda: density_cells(load_density()[cell_deg], cell_deg, **selection),
+                  cell_deg=cell_deg, **selection)
+    with stage('density_deck'):
+        st.pydeck_chart(density_deck(cells))
+
+# Painel de debug na sidebar e registros no log estruturado (utils.profiler)
+finish_run(run)
 
 #### Streamlist detecta a pasta "pages" e coloca dentro #####
@@ -1,44 +1,24 @@
 # Libraries
-from haversine import haversine
-import plotly.express as px
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import re
-import datetime as dt
-from PIL import Image
-import inflection
-import io
-import base64
-
-# Libs necessárias
-import pandas as pd
-import numpy as np
 import streamlit as st
-import folium
-from streamlit_folium import folium_static
+
+from utils.assets import logo_src
+from utils.cache import cached
+from utils.charts import bar_chart, cached_figure
+from utils.cuisines import cuisine_ratings, load_cuisine_index, present_cuisines
+from utils.data import load_data
+from utils.filters import load_filter_index, select_rows
+from utils.profiler import finish_run, stage, start_run, timed
+from utils.ranking import load_ranking, top_n, top_rows
 
 st.set_page_config( page_title= 'Cuisines', page_icon='🥗', layout= 'wide')
 
+# Perfil da execução (tempo, linhas e memória por etapa), só com FOME_ZERO_PROFILE=1
+run = start_run('Cuisines')
+
 # ====================================================================
 # FUNCTIONS
 # ====================================================================
 
-def clean_code(df):
-    """
-    FUNÇÃO DE DATA CLEANSING:  
-    1. EXCLUSÃO LINHAS NAN
-   
-    INPUT: DATAFRAME
-    OUTPUT: DATAFRAME
-    """
-    # Substituir 'Nan ' por np.nan usando lambda
-    df = df.applymap(lambda x: np.nan if x == 'Nan ' else x)
-
-    # Excluir linhas contendo np.nan
-    df.dropna(inplace=True)
-  
-    return df
-
 # ====================================================================
 # FUNCTION 1 - Best Restaurants by Cuisine
 # ====================================================================
@@ -63,7 +43,7 @@ def display_restaurant_metric(col, dataframe, index):
 # FUNCTION 2 - Top 20 Restaurants
 # ====================================================================
  
-def top_restaurants(df, n_results=10): # Adicione n_results como um argumento padrão
+def top_restaurants(df, n_results=10): # df já vem na ordem do ranking (nota, depois votos)
     # Inserindo o título centralizado e em fonte grande
     st.markdown(f'<div style="text-align: center; font-size: 2em; margin-bottom: 20px;">Top {n_results} Restaurants</div>', unsafe_allow_html=True)
     
@@ -72,7 +52,6 @@ def top_restaurants(df, n_results=10): # Adicione n_results como um argumento pa
     
     with col2:
         rating = (df.loc[:, ['restaurant_id', 'restaurant_name','country','city','cuisines','average_cost_for_two', 'aggregate_rating','votes']]
-                  .sort_values('aggregate_rating', ascending = False)
                   .reset_index()
                   .head(n_results))
         st.dataframe(rating)
@@ -81,209 +60,59 @@ def top_restaurants(df, n_results=10): # Adicione n_results como um argumento pa
 # FUNCTION 3 - Top 20 Best Cuisines
 # ====================================================================
  
-def best_cuisines(df, n_results=10):
-    df_aux = (round(df.groupby('main_cuisine')
-          .aggregate_rating.mean() 
-          .reset_index()
-          .sort_values('aggregate_rating', ascending=False)
-          .head(n_results),2))
+def best_cuisines(ratings, n_results=10):
+    df_aux = (round(top_n(ratings, 'avg_rating', n_results)
+          .loc[:, ['cuisine', 'avg_rating']],2))
     df_aux.columns = ['Cuisines','Average Rating']
 
-    fig = px.bar(df_aux,
-                 x='Cuisines',
-                 y='Average Rating',
-                 title="Top 20 Best Cuisines",               
-                 color_continuous_scale='Blues',
-                 hover_name='Cuisines',
-                 hover_data={'Cuisines': True,                             
-                             'Average Rating': ':,.2f'}
-                 )
-    
-    fig.update_layout(
-        title={
-            'text': f"Top {n_results} Best Cuisines", 
-            'y':0.95,
-            'x':0.5,
-            'xanchor': 'center',
-            'yanchor': 'top'
-        }        
-    )
-    
-    fig.update_traces(marker_line_color='black',
-                      marker_line_width=1,
-                      opacity=0.8,
-                      text=df_aux['Average Rating'],
-                      textposition='inside')
-    
-    fig.update_layout(xaxis_title='Cuisines',
-                      yaxis_title='Average Rating',
-                      xaxis={'categoryorder':'total descending'})
-    
-    return fig
+    # Nota escrita dentro da barra
+    return bar_chart(df_aux,
+                     x='Cuisines',
+                     y='Average Rating',
+                     title=f"Top {n_results} Best Cuisines",
+                     hover_name='Cuisines',
+                     value_format=':,.2f',
+                     category_order='total descending',
+                     opacity=0.8,
+                     textposition='inside')
 
 # ====================================================================
 # FUNCTION 4 - Top 20 Worst Cuisines
 # ====================================================================
  
-def worst_cuisines(df, n_results=10):
-    df_aux = (df.groupby('main_cuisine')
-          .aggregate_rating.mean() 
-          .reset_index()
-          .query('aggregate_rating > 0')  # Filtra as entradas com aggregate_rating maior que 0
-          .sort_values('aggregate_rating', ascending=True)
-          .head(n_results))
-
-    df_aux['aggregate_rating'] = df_aux['aggregate_rating'].round(2)  # Arredonda os valores após todos os cálculos
+def worst_cuisines(ratings, n_results=10):
+    df_aux = (top_n(ratings.query('avg_rating > 0'),  # Filtra as entradas com nota média maior que 0
+                    'avg_rating', n_results, ascending=True)
+          .loc[:, ['cuisine', 'avg_rating']])
+
+    df_aux['avg_rating'] = df_aux['avg_rating'].round(2)  # Arredonda os valores após todos os cálculos
     df_aux.columns = ['Cuisines','Average Rating']
 
-    fig = px.bar(df_aux,
-                 x='Cuisines',
-                 y='Average Rating',
-                 title="Top 20 Worst Cuisines",               
-                 color_continuous_scale='Blues',
-                 hover_name='Cuisines',
-                 hover_data={'Cuisines': True,                             
-                             'Average Rating': ':,.2f'}
-                 )
-    
-    fig.update_layout(
-        title={
-            'text': f"Top {n_results} Worst Cuisines", 
-            'y':0.95,
-            'x':0.5,
-            'xanchor': 'center',
-            'yanchor': 'top'
-        }        
-    )
-    
-    fig.update_traces(marker_line_color='black',
-                      marker_line_width=1,
-                      opacity=0.8,
-                      text=df_aux['Average Rating'],
-                      textposition='inside')
-    
-    fig.update_layout(xaxis_title='Cuisines',
-                      yaxis_title='Average Rating',
-                      xaxis={'categoryorder':'total ascending'})
-    
-    return fig
+    return bar_chart(df_aux,
+                     x='Cuisines',
+                     y='Average Rating',
+                     title=f"Top {n_results} Worst Cuisines",
+                     hover_name='Cuisines',
+                     value_format=':,.2f',
+                     category_order='total ascending',
+                     opacity=0.8,
+                     textposition='inside')
 
 # ====================================================================
 # IMPORT DATASET
 # ====================================================================
-df = pd.read_csv("dataset/zomato.csv")
 
-# rodar o streamlit no cmd: python -m streamlit run cities.py
-# identar automaticamente: shift + alt + L
+# Dataset preparado uma única vez por processo (cache pelo mtime/tamanho do CSV)
+df = timed('load_data', load_data)
 
-# ====================================================================
-# DATA CLEANSING
-# ====================================================================
-df = clean_code(df)
+# Índice restaurante <-> culinária (lista 'cuisines' separada uma única vez)
+cuisines = timed('load_cuisine_index', load_cuisine_index)
 
-# ====================================================================
-# MODELAGEM DATASET
-# ====================================================================
+# Linhas de cada valor das colunas filtráveis (país, culinárias...)
+filter_index = timed('load_filter_index', load_filter_index)
 
-# Nome dos países e coluna
-countries = {
-1: "India",
-14: "Australia",
-30: "Brazil",
-37: "Canada",
-94: "Indonesia",
-148: "New Zeland",
-162: "Philippines",
-166: "Qatar",
-184: "Singapure",
-189: "South Africa",
-191: "Sri Lanka",
-208: "Turkey",
-214: "United Arab Emirates",
-215: "England",
-216: "United States of America",
-}
-
-def country_name(country_id):
-    return countries[country_id]
-
-# Criando uma coluna com base no country code
-df['Country'] = df['Country Code'].map(country_name)
-
-# Tipo de Categoria de Comida e Coluna
-
-def create_price_tye(price_range):
-    if price_range == 1:
-        return "cheap"
-    elif price_range == 2:
-        return "normal"
-    elif price_range == 3:
-        return "expensive"
-    else:
-        return "gourmet"
-
-df['Price_type'] = df['Price range'].map(create_price_tye)
-
-# Nome das cores
-
-colors = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-}
-
-def color_name(color_code):
-    return colors[color_code]
-
-# Renomear as colunas do df
-
-def rename_columns(dataframe):
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    return df
-
-df = rename_columns(df)
-
-#Remoção valor Outlier
-index_max = df['average_cost_for_two'].idxmax()
-print(df.loc[index_max])
-df.drop(index_max, inplace=True)
-
-#Conversão de valores para Dólar:
-exchange_rates = {
-    'Dollar($)': 1,
-    'Brazilian Real(R$)': 4.95,
-    'Indonesian Rupiah(IDR)': 14300,
-    'Sri Lankan Rupee(LKR)': 200,
-    'Botswana Pula(P)': 11,
-    'Indian Rupees(Rs.)': 75,
-    'Rand(R)': 15,
-    'Qatari Rial(QR)': 3.64,
-    'Emirati Diram(AED)': 3.67,
-    'Turkish Lira(TL)': 8.5,
-    'Pounds(£)': 0.73,
-    'NewZealand($)': 1.4
-}
-
-# Convertendo os valores
-df['avg_cost_for_two_dol'] = df.apply(lambda row: row['average_cost_for_two'] / exchange_rates[row['currency']], axis=1)
-
-# Arredondando os valores para 2 casas decimais
-df['avg_cost_for_two_dol'] = df['avg_cost_for_two_dol'].round(2)
-
-# Crie a coluna 'main_cuisine' pegando apenas o primeiro valor (até a primeira vírgula) da coluna 'cuisines'
-df['main_cuisine'] = df['cuisines'].str.split(',').str[0]  
+# Posição de cada restaurante na ordenação por nota (desempate por votos)
+ranking = timed('load_ranking', load_ranking)
 
 # ====================================================================
 # LAYOUT SIDEBAR
@@ -293,22 +122,13 @@ df['main_cuisine'] = df['cuisines'].str.split(',').str[0]
 # SIDEBAR LOGO
 # ====================================================================
 
-# Carregar a imagem
-img = plt.imread('images/cuisine_logo.png')
-
-# Converter a imagem para bytes
-buf = io.BytesIO()
-Image.fromarray((img * 255).astype('uint8')).save(buf, format='png')
-
-# Codificar a imagem em base64
-encoded_img = base64.b64encode(buf.getvalue()).decode('utf-8')
-
+# Logo processado uma vez por processo (utils.assets): arquivo estático com hash ou base64 já calculado
 # Centralizar a imagem na barra lateral usando HTML/CSS
 st.sidebar.markdown("""
     <div style="display: flex; justify-content: center;">
-        <img src="data:image/png;base64,{}" width="60"/>
+        <img src="{}" width="60"/>
     </div>
-""".format(encoded_img), unsafe_allow_html=True)
+""".format(logo_src('cuisine_logo.png')), unsafe_allow_html=True)
 
 # ====================================================================
 # SIDEBAR TITLES
@@ -341,8 +161,7 @@ country_options = st.sidebar.multiselect(
     countries, default= 'Brazil')
 
 # Countries filter
-selected_countries = df['country'].isin(country_options)
-df = df.loc[selected_countries, :]
+selected_rows = timed('filter.country', select_rows, filter_index, country=country_options)
 
 # ====================================================================
 # SLIDER RESTAURANTS FILTER
@@ -361,8 +180,9 @@ st.sidebar.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
-# Cuisine's List
-unique_cuisines = df['main_cuisine'].unique().tolist()
+# Cuisine's List (todas as culinárias de cada restaurante, não só a principal)
+unique_cuisines = timed('cuisines.options', cached, 'cuisines.options', lambda: present_cuisines(cuisines, selected_rows),
+                        country=country_options)
 
 # Multiple cuisine selection
 cuisine_options = st.sidebar.multiselect(
@@ -372,8 +192,20 @@ cuisine_options = st.sidebar.multiselect(
 )
 
 # Filtro Countries
-selected_cuisines = df['main_cuisine'].isin(cuisine_options)
-df = df.loc[selected_cuisines, :]
+selected_rows = timed('filter.cuisines', select_rows, filter_index, country=country_options, cuisines=cuisine_options)
+
+# Resultados memoizados pela seleção da sidebar (utils.cache): cada seleção é calculada uma vez para todas as sessões
+selection = dict(country=country_options, cuisines=cuisine_options, number_of_results=number_of_results)
+
+# Melhores restaurantes da seleção pelo ranking pré-calculado (sem ordenar nem copiar a seleção)
+ranked = timed('cuisines.ranked', cached, 'cuisines.ranked',
+               lambda: df.iloc[selected_rows[top_rows(ranking, selected_rows, max(number_of_results, 5))]],
+               **selection)
+
+# Nota média por culinária selecionada (restaurante conta em todas as suas culinárias)
+ratings = timed('cuisines.ratings', cached, 'cuisines.ratings',
+                lambda: cuisine_ratings(cuisines, df.iloc[selected_rows], cuisine_options),
+                country=country_options, cuisines=cuisine_options)
 
 # ====================================================================
 # SIDEBAR BOTTOM TEXT
@@ -411,9 +243,9 @@ with st.container():
     col1, col2, col3, col4, col5 = st.columns(5)
     
     # Ordenando o dataframe pelos melhores ratings e pegando os top 5
-    sorted_df = (df[['restaurant_name', 'main_cuisine', 'city', 'country', 'average_cost_for_two', 
+    sorted_df = (ranked[['restaurant_name', 'main_cuisine', 'city', 'country', 'average_cost_for_two', 
                     'currency', 'aggregate_rating']]
-                    .sort_values('aggregate_rating', ascending=False).head(5))
+                    .head(5))
 
     # Exibindo os cinco melhores restaurantes usando a função
     display_restaurant_metric(col1, sorted_df, 0)
@@ -427,18 +259,24 @@ with st.container():
 
 with st.container():
         # CHART2: Top 20 Restaurants
-        top_restaurants(df,number_of_results)
+        with stage('cuisines.top_restaurants'):
+            top_restaurants(ranked,number_of_results)
 
 with st.container():
     col1, col2 = st.columns(2)
         
     with col1:
         # CHART1: Top 20 Best Cuisines
-        fig = best_cuisines(df,number_of_results)        
-        st.plotly_chart(fig, use_container_width=True)
+        fig = cached_figure('cuisines.best_cuisines', lambda: best_cuisines(ratings, number_of_results), **selection)
+        with stage('cuisines.best_cuisines.plotly_chart'):
+            st.plotly_chart(fig, use_container_width=True)
             
     with col2:
         # CHART1: Top 20 Worst Cuisines
-        fig = worst_cuisines(df,number_of_results)        
-        st.plotly_chart(fig, use_container_width=True)
-       
\ No newline at end of file
+        fig = cached_figure('cuisines.worst_cuisines', lambda: worst_cuisines(ratings, number_of_results), **selection)
+        with stage('cuisines.worst_cuisines.plotly_chart'):
+            st.plotly_chart(fig, use_container_width=True)
+       
+
+# Painel de debug na sidebar e registros no log estruturado (utils.profiler)
+finish_run(run)
@@ -0,0 +1 @@
+# Módulos compartilhados entre a Home e as páginas do dashboard
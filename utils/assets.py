@@ -0,0 +1,136 @@
+# Libraries
+import base64
+import hashlib
+import io
+import os
+import re
+from functools import lru_cache
+
+from utils.paths import IMAGES_DIR, STATIC_DIR
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Logos embutidos no HTML das páginas e a largura (px) em que aparecem
+LOGOS = {
+    'cuisine_logo.png': 60,
+    'github_logo.png': 20,
+}
+
+# Pixels da imagem por pixel exibido (telas de alta densidade)
+PIXEL_RATIO = 2
+
+# URL da pasta static/ no servidor do streamlit
+STATIC_URL = 'app/static/'
+
+# ====================================================================
+# BUILD
+# ====================================================================
+
+def process_logo(path, width):
+    """
+    FUNÇÃO DE PROCESSAMENTO DE UM LOGO:
+    1. REDIMENSIONA PARA width x PIXEL_RATIO PIXELS DE LARGURA (MANTÉM A PROPORÇÃO, NUNCA AMPLIA)
+    2. REGRAVA COMO PNG OTIMIZADO
+
+    INPUT: CAMINHO DA IMAGEM, LARGURA EXIBIDA
+    OUTPUT: BYTES DO PNG
+    """
+    # PIL só é importado no build dos assets, nunca no caminho de um rerun
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image = image.convert('RGBA')
+        # Caixa limitada só na largura
+        image.thumbnail((width * PIXEL_RATIO, image.height))
+        buf = io.BytesIO()
+        image.save(buf, format='png', optimize=True)
+    return buf.getvalue()
+
+def hashed_name(filename, data):
+    """Nome com o hash do conteúdo: cuisine_logo.png -> cuisine_logo.1a2b3c4d5e6f.png"""
+    stem, ext = os.path.splitext(filename)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+
+def _write_static(data, filename, name, directory):
+    """Grava o asset (nome com hash) na pasta static/ e apaga as versões antigas; disco somente leitura não é erro."""
+    path = os.path.join(directory, name)
+    stem, ext = os.path.splitext(filename)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(path):
+            # Mesmo nome = mesmo conteúdo: só grava quando o hash é novo
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        stale = re.compile(re.escape(stem) + r'\.[0-9a-f]{12}' + re.escape(ext) + '$')
+        for old in os.listdir(directory):
+            if old != name and stale.match(old):
+                os.remove(os.path.join(directory, old))
+    except OSError:
+        return False
+    return True
+
+def build_assets(images_dir=IMAGES_DIR, static_dir=STATIC_DIR):
+    """
+    FUNÇÃO DE BUILD DOS ASSETS (python -m utils.assets):
+    1. PROCESSA CADA LOGO (REDIMENSIONADO E OTIMIZADO)
+    2. GRAVA EM static/ COM O HASH DO CONTEÚDO NO NOME (CACHE DO NAVEGADOR NUNCA FICA VELHO)
+    3. GUARDA TAMBÉM O BASE64, PARA QUANDO A PASTA static/ NÃO É SERVIDA
+
+    INPUT: PASTA DAS IMAGENS ORIGINAIS, PASTA static/
+    OUTPUT: DICT logo -> file, static (GRAVOU?), data_uri
+    """
+    assets = {}
+    for filename, width in LOGOS.items():
+        data = process_logo(os.path.join(images_dir, filename), width)
+        name = hashed_name(filename, data)
+        assets[filename] = {
+            'file': name,
+            'static': _write_static(data, filename, name, static_dir),
+            'data_uri': 'data:image/png;base64,' + base64.b64encode(data).decode('utf-8'),
+        }
+    return assets
+
+@lru_cache(maxsize=2)
+def _load_assets(versions):
+    # versions (mtime e tamanho de cada imagem) faz parte da chave: se um logo mudar, o build é refeito
+    return build_assets()
+
+def load_assets():
+    """Assets da versão atual das imagens, processados uma vez por processo (somente leitura)."""
+    versions = []
+    for filename in LOGOS:
+        stat = os.stat(os.path.join(IMAGES_DIR, filename))
+        versions.append((filename, stat.st_mtime_ns, stat.st_size))
+    return _load_assets(tuple(versions))
+
+# ====================================================================
+# QUERY
+# ====================================================================
+
+def static_serving():
+    """True se o streamlit está servindo a pasta static/ (server.enableStaticServing)."""
+    import streamlit as st
+
+    return bool(st.get_option('server.enableStaticServing'))
+
+def logo_src(filename):
+    """
+    Valor do src de um <img> para o logo: URL do arquivo estático (o navegador
+    baixa uma vez e guarda em cache) ou, sem static/, o base64 já calculado.
+    """
+    asset = load_assets()[filename]
+    if asset['static'] and static_serving():
+        return STATIC_URL + asset['file']
+    return asset['data_uri']
+
+# ====================================================================
+# BUILD STEP: python -m utils.assets
+# ====================================================================
+
+if __name__ == '__main__':
+    for logo, built in build_assets().items():
+        print(logo, '->', os.path.join(STATIC_DIR, built['file']) if built['static'] else 'base64 (static/ não gravável)')
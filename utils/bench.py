@@ -0,0 +1,366 @@
+# Libraries
+import argparse
+import ast
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import folium
+import numpy as np
+import pandas as pd
+
+from utils.cube import build_cube
+from utils.cuisines import build_cuisine_index, cuisine_ratings
+from utils.currency import convert_to_dollar, load_rates
+from utils.data import (add_country_price_type, add_main_cuisine, clean_code, remove_duplicates, remove_outlier,
+                        rename_columns)
+from utils.maps import START_LOCATION, START_ZOOM, cluster_layer
+from utils.paths import DATASET_PATH, RATES_PATH, ROOT_DIR
+from utils.schema import apply_schema
+from utils.spatial import build_index, within_bounds
+from utils.synthetic import build_profile, write_dataset
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Multiplicadores do dataset original (1000x ~ 7,5 milhões de linhas: a entrada de cada
+# etapa do pipeline é liberada depois da etapa seguinte, mas ainda precisa de bastante RAM)
+SCALES = [1, 10, 100, 1000]
+
+# Arquivo de resultados padrão (fora do git)
+RESULTS_PATH = os.path.join(ROOT_DIR, 'bench_results.json')
+
+# Diretório dos datasets ampliados (reaproveitados entre execuções)
+WORK_DIR = os.path.join(tempfile.gettempdir(), 'fome_zero_bench')
+
+# Scripts das páginas do dashboard
+PAGES = {
+    'Home': 'Home.py',
+    'Countries': os.path.join('pages', 'Countries.py'),
+    'Cities': os.path.join('pages', 'Cities.py'),
+    'Cuisines': os.path.join('pages', 'Cuisines.py'),
+}
+
+# Módulos mais caros listados no perfil de imports de cada página
+TOP_IMPORTS = 10
+
+# Funções de gráfico de cada página e os argumentos (chaves do contexto) que elas recebem
+PAGE_CHARTS = {
+    'Countries': [
+        ('rest_by_country', ['cube']),
+        ('cities_by_country', ['cube']),
+        ('avg_rating_by_country', ['cube']),
+        ('avg_cost_by_country', ['cube']),
+    ],
+    'Cities': [
+        ('top_cities', ['cube']),
+        ('avg_high_score', ['cube']),
+        ('avg_low_score', ['cube']),
+        ('distinct_cuisines', ['cuisine_index', 'df']),
+    ],
+    'Cuisines': [
+        ('best_cuisines', ['ratings']),
+        ('worst_cuisines', ['ratings']),
+    ],
+}
+
+# ====================================================================
+# DATASETS
+# ====================================================================
+
+def scaled_dataset(scale, directory=WORK_DIR, source=DATASET_PATH, seed=0):
+    """
+    FUNÇÃO DO DATASET AMPLIADO:
+    1. CONTA AS LINHAS DO CSV ORIGINAL
+    2. GERA 'scale' VEZES ESSE TOTAL COM utils.synthetic (MESMAS DISTRIBUIÇÕES, MEMÓRIA CONSTANTE)
+
+    O arquivo é gerado uma vez por escala e semente e reaproveitado nas execuções seguintes.
+
+    INPUT: MULTIPLICADOR, DIRETÓRIO DE TRABALHO, CSV ORIGINAL, SEMENTE
+    OUTPUT: CAMINHO DO CSV (O PRÓPRIO ORIGINAL COM scale=1)
+    """
+    if scale == 1:
+        return source
+
+    path = os.path.join(directory, f'zomato_x{scale}_seed{seed}.csv')
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(directory, exist_ok=True)
+    raw = pd.read_csv(source)
+    profile = build_profile(raw, load_rates(RATES_PATH))
+    return write_dataset(path, scale * len(raw), seed, profile)
+
+# ====================================================================
+# PAGES
+# ====================================================================
+
+def page_functions(path):
+    """
+    Funções definidas no script de uma página, sem executar a página:
+    só os imports e os 'def' do módulo são compilados (nada de widgets
+    nem de st.set_page_config).
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    tree.body = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef))]
+    namespace = {}
+    exec(compile(tree, path, 'exec'), namespace)
+    return namespace
+
+def import_profile(path, top=TOP_IMPORTS):
+    """
+    FUNÇÃO DO PERFIL DE IMPORTS DE UMA PÁGINA:
+    1. EXECUTA SÓ OS IMPORTS DO TOPO DO SCRIPT NUM PROCESSO NOVO (python -X importtime)
+    2. SOMA O TEMPO ACUMULADO DOS MÓDULOS DE PRIMEIRO NÍVEL (INCLUI A PARTIDA DO INTERPRETADOR)
+    3. LISTA OS 'top' MÓDULOS MAIS CAROS
+
+    Imports feitos dentro de funções (carregados só quando o recurso é usado)
+    ficam de fora: é o custo de partida da página.
+
+    INPUT: CAMINHO DA PÁGINA, QUANTOS MÓDULOS LISTAR
+    OUTPUT: DICT seconds (IMPORTS), process_seconds (PROCESSO INTEIRO) E modules (SEGUNDOS POR MÓDULO)
+    """
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    tree = ast.parse(source, filename=path)
+    code = '\n'.join(ast.get_source_segment(source, node) for node in tree.body
+                     if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+    start = time.perf_counter()
+    run = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT_DIR,
+                         capture_output=True, text=True, check=True)
+    process_seconds = time.perf_counter() - start
+
+    # Linhas 'import time: self | cumulative | módulo'; primeiro nível tem um único espaço antes do nome
+    modules = {}
+    for line in run.stderr.splitlines():
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line.split('|')
+        if not name.startswith('  '):
+            modules[name.strip()] = int(cumulative) / 1e6
+
+    heaviest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {'seconds': round(sum(modules.values()), 6),
+            'process_seconds': round(process_seconds, 6),
+            'modules': {name: round(seconds, 6) for name, seconds in heaviest}}
+
+def map_build(df, index):
+    """Mesmo trabalho do display_map da Home na primeira renderização: camada de clusters do mundo inteiro e HTML do mapa."""
+    rows = within_bounds(index, None)
+    m = folium.Map(location=START_LOCATION, zoom_start=START_ZOOM)
+    cluster_layer(df.iloc[rows], START_ZOOM).add_to(m)
+    return m.get_root().render()
+
+# ====================================================================
+# MEASUREMENT
+# ====================================================================
+
+def measure(fn, repeat=1, memory=True, setup=None):
+    """
+    FUNÇÃO DE MEDIÇÃO DE UMA ETAPA:
+    1. TEMPO DE PAREDE: MENOR DE 'repeat' EXECUÇÕES
+    2. PICO DE MEMÓRIA (tracemalloc) NUMA EXECUÇÃO À PARTE, PARA NÃO DISTORCER O TEMPO
+    3. setup (OPCIONAL) MONTA A ENTRADA DE fn ANTES DE CADA EXECUÇÃO, FORA DA MEDIÇÃO
+       (EX.: CÓPIA DE UM DATAFRAME QUE fn ALTERA)
+
+    INPUT: FUNÇÃO (SEM ARGUMENTOS OU COM O RESULTADO DE setup), REPETIÇÕES, MEDIR MEMÓRIA?, setup
+    OUTPUT: (RESULTADO, SEGUNDOS, PICO EM BYTES OU None)
+    """
+    def inputs():
+        return (setup(),) if setup else ()
+
+    seconds = []
+    for _ in range(repeat):
+        args = inputs()
+        start = time.perf_counter()
+        result = fn(*args)
+        seconds.append(time.perf_counter() - start)
+        del args
+
+    peak = None
+    if memory:
+        args = inputs()
+        tracemalloc.start()
+        try:
+            fn(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, min(seconds), peak
+
+def run_dataset(path, rates, pages, repeat=1, memory=True):
+    """
+    FUNÇÃO DO BENCHMARK DE UM DATASET:
+    1. PIPELINE DE PREPARAÇÃO, ETAPA POR ETAPA (AS FUNÇÕES DE utils.data.prepare_data)
+    2. ESTRUTURAS DERIVADAS (CUBO, ÍNDICES)
+    3. FUNÇÕES DE GRÁFICO DAS PÁGINAS (TODOS OS PAÍSES SELECIONADOS)
+    4. CONSTRUÇÃO DO MAPA DA HOME
+
+    INPUT: CAMINHO DO CSV, TAXAS DE CÂMBIO, FUNÇÕES DAS PÁGINAS, REPETIÇÕES, MEDIR MEMÓRIA?
+    OUTPUT: LISTA DE DICTS group, stage, rows (LINHAS DA ENTRADA), seconds, peak_bytes
+    """
+    ctx = {}
+    results = []
+
+    def stage(group, name, fn, source=None, setup=None):
+        ctx[name], seconds, peak = measure(fn, repeat, memory, setup)
+        rows = len(ctx[source]) if source else None
+        results.append({'group': group, 'stage': name, 'rows': rows,
+                        'seconds': round(seconds, 6), 'peak_bytes': peak})
+        print(f'  {group:<9} {name:<34} {seconds:9.3f} s', file=sys.stderr)
+
+    stage('pipeline', 'read_csv', lambda: pd.read_csv(path))
+    results[-1]['rows'] = len(ctx['read_csv'])
+
+    # Cada etapa recebe o resultado da anterior, que é liberado logo depois de medida. As etapas
+    # que alteram o dataframe recebido ganham uma cópia a cada execução, feita fora da medição
+    stage('pipeline', 'clean_code', lambda: clean_code(ctx['read_csv']), 'read_csv')
+    del ctx['read_csv']
+    stage('pipeline', 'rename_columns', lambda df: rename_columns(add_country_price_type(df)), 'clean_code',
+          setup=lambda: ctx['clean_code'].copy())
+    del ctx['clean_code']
+    stage('pipeline', 'remove_duplicates', lambda: remove_duplicates(ctx['rename_columns']), 'rename_columns')
+    del ctx['rename_columns']
+    stage('pipeline', 'remove_outlier', lambda: remove_outlier(ctx['remove_duplicates']), 'remove_duplicates')
+    del ctx['remove_duplicates']
+    stage('pipeline', 'convert_to_dollar', lambda df: convert_to_dollar(df, rates), 'remove_outlier',
+          setup=lambda: ctx['remove_outlier'].copy())
+    del ctx['remove_outlier']
+    stage('pipeline', 'main_cuisine', add_main_cuisine, 'convert_to_dollar',
+          setup=lambda: ctx['convert_to_dollar'].copy())
+    del ctx['convert_to_dollar']
+    stage('pipeline', 'apply_schema', lambda: apply_schema(ctx['main_cuisine']), 'main_cuisine')
+    del ctx['main_cuisine']
+
+    ctx['df'] = ctx.pop('apply_schema')
+    stage('index', 'cube', lambda: build_cube(ctx['df']), 'df')
+    stage('index', 'cuisine_index', lambda: build_cuisine_index(ctx['df']), 'df')
+    stage('index', 'spatial_index', lambda: build_index(ctx['df']), 'df')
+    stage('index', 'ratings', lambda: cuisine_ratings(ctx['cuisine_index'], ctx['df']), 'df')
+
+    for page, charts in PAGE_CHARTS.items():
+        for name, args in charts:
+            fn = pages[page][name]
+            # Linhas da entrada: o dataframe, quando a função recebe um (o índice de culinárias é um dict)
+            source = 'df' if 'df' in args else args[0]
+            stage('chart', f'{page}.{name}', lambda: fn(*[ctx[arg] for arg in args]), source)
+
+    stage('map', 'Home.display_map', lambda: map_build(ctx['df'], ctx['spatial_index']), 'df')
+    return results
+
+# ====================================================================
+# RESULTS
+# ====================================================================
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(scales=SCALES, repeat=1, memory=True, directory=WORK_DIR, seed=0):
+    """
+    FUNÇÃO DO BENCHMARK COMPLETO:
+    1. PERFIL DE IMPORTS DE CADA PÁGINA (PROCESSO NOVO)
+    2. GERA (OU REAPROVEITA) OS DATASETS AMPLIADOS
+    3. MEDE TODAS AS ETAPAS EM CADA ESCALA
+    4. ANOTA COMMIT, VERSÕES E MÁQUINA PARA COMPARAR EXECUÇÕES
+
+    INPUT: MULTIPLICADORES, REPETIÇÕES, MEDIR MEMÓRIA?, DIRETÓRIO DE TRABALHO, SEMENTE
+    OUTPUT: DICT meta, imports E results (SERIALIZÁVEL EM JSON)
+    """
+    imports = []
+    for page, path in PAGES.items():
+        profile = import_profile(os.path.join(ROOT_DIR, path))
+        imports.append({'page': page, **profile})
+        print(f'  {"import":<9} {page:<34} {profile["seconds"]:9.3f} s', file=sys.stderr)
+
+    pages = {page: page_functions(os.path.join(ROOT_DIR, PAGES[page])) for page in PAGE_CHARTS}
+    rates = load_rates(RATES_PATH)
+
+    results = []
+    for scale in scales:
+        path = scaled_dataset(scale, directory, seed=seed)
+        print(f'{os.path.basename(path)} (x{scale})', file=sys.stderr)
+        for record in run_dataset(path, rates, pages, repeat, memory):
+            results.append({'scale': scale, **record})
+
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'imports': imports,
+        'results': results,
+    }
+
+def results_table(report):
+    """Resultados como DataFrame: uma linha por escala e etapa."""
+    return pd.DataFrame(report['results']).set_index(['scale', 'stage'])
+
+def imports_table(report):
+    """Perfil de imports como DataFrame: uma linha por página (arquivos antigos não têm perfil)."""
+    imports = pd.DataFrame(report.get('imports', []), columns=['page', 'seconds', 'process_seconds'])
+    return imports.set_index('page')
+
+def _ratios(old, new, columns):
+    table = old[columns].join(new[columns], how='inner', lsuffix='_old', rsuffix='_new')
+    for col in columns:
+        # float: colunas sem medida (ex.: --no-memory) vêm como None
+        table[f'{col}_ratio'] = (table[f'{col}_new'].astype(float) / table[f'{col}_old'].astype(float)).round(2)
+    return table
+
+def compare(old, new):
+    """
+    Compara dois arquivos de resultados (ex.: de dois commits): tempo e pico
+    de memória de cada etapa e a razão novo / antigo.
+    """
+    return _ratios(results_table(old), results_table(new), ['seconds', 'peak_bytes'])
+
+def compare_imports(old, new):
+    """Mesma comparação para o perfil de imports das páginas."""
+    return _ratios(imports_table(old), imports_table(new), ['seconds', 'process_seconds'])
+
+# ====================================================================
+# COMMAND LINE (python -m utils.bench)
+# ====================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline de dados do dashboard.')
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true', help='não mede o pico de memória')
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--workdir', default=WORK_DIR)
+    parser.add_argument('--seed', type=int, default=0, help='semente dos datasets sintéticos')
+    parser.add_argument('--compare', metavar='OLD_RESULTS', help='arquivo de resultados anterior')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.scales, args.repeat, not args.no_memory, args.workdir, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            old_report = json.load(f)
+        print(compare_imports(old_report, report).to_string())
+        print(compare(old_report, report).to_string())
+    else:
+        print(imports_table(report).to_string())
+        print(results_table(report)[['rows', 'seconds', 'peak_bytes']].to_string())
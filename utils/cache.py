@@ -0,0 +1,144 @@
+# Libraries
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.data import dataset_version
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Orçamento padrão do cache de resultados (MB); a variável de ambiente muda o valor
+DEFAULT_BUDGET_MB = 256
+BUDGET_ENV = 'FOME_ZERO_CACHE_MB'
+
+# ====================================================================
+# KEYS AND SIZES
+# ====================================================================
+
+def normalize_selection(selections):
+    """
+    Seleções da sidebar em forma canônica: listas viram tuplas ordenadas, então
+    ['Brazil', 'India'] e ['India', 'Brazil'] dão a mesma chave.
+    """
+    key = []
+    for name, value in sorted(selections.items()):
+        if isinstance(value, (list, tuple, set, np.ndarray)):
+            value = tuple(sorted(value))
+        key.append((name, value))
+    return tuple(key)
+
+def result_size(value):
+    """Bytes estimados de um resultado (DataFrames com deep=True; figuras pelo tamanho do JSON)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(result_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(result_size(k) + result_size(v) for k, v in value.items())
+    if hasattr(value, 'to_plotly_json'):
+        return len(value.to_json())
+    return sys.getsizeof(value)
+
+# ====================================================================
+# LRU CACHE
+# ====================================================================
+
+class ResultCache:
+    """
+    Cache LRU com orçamento em bytes, compartilhado por todas as sessões do
+    processo (as sessões do streamlit rodam em threads, daí o lock).
+
+    Os valores guardados são entregues a todas as sessões: tratar como somente leitura.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()  # chave -> (valor, bytes)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(True, valor) se a chave está no cache (e passa a ser a mais recente); senão (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key, value):
+        """Guarda o valor e descarta os menos usados até caber no orçamento; maior que o orçamento não entra."""
+        size = result_size(value)
+        if size > self.budget_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.budget_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """Contadores do cache: acertos, faltas, descartes, entradas e bytes ocupados."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.nbytes,
+                'budget_bytes': self.budget_bytes,
+            }
+
+# Uma instância por processo: todas as sessões e páginas compartilham os resultados
+RESULTS = ResultCache(int(float(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MB)) * 2**20))
+
+def cached(name, compute, **selections):
+    """
+    FUNÇÃO DE RESULTADO MEMOIZADO POR SELEÇÃO, EX.:
+    fig = cached('countries.rest_by_country', lambda: rest_by_country(cube), country=country_options)
+
+    1. CHAVE: NOME DO RESULTADO + VERSÃO DO DATASET + SELEÇÕES NORMALIZADAS
+    2. ACERTO: DEVOLVE O RESULTADO GUARDADO (QUALQUER SESSÃO PODE TÊ-LO CALCULADO)
+    3. FALTA: CALCULA COM compute() E GUARDA
+
+    As seleções precisam determinar o resultado por completo: tudo o que
+    compute() lê além do dataset deve estar nelas.
+
+    INPUT: NOME DO RESULTADO, FUNÇÃO SEM ARGUMENTOS, SELEÇÕES DA SIDEBAR
+    OUTPUT: RESULTADO (SOMENTE LEITURA)
+    """
+    key = (name, dataset_version(), normalize_selection(selections))
+    found, value = RESULTS.get(key)
+    if not found:
+        value = compute()
+        RESULTS.put(key, value)
+    return value
+
+def cache_stats():
+    """Contadores do cache compartilhado de resultados."""
+    return RESULTS.stats()
@@ -0,0 +1,127 @@
+# Libraries
+import json
+from functools import lru_cache
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from utils.cache import cached
+from utils.profiler import stage
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Estilo comum das barras (antes repetido em cada função com update_traces)
+BAR_STYLE = {
+    'marker': {'line': {'color': 'black', 'width': 1}},  # Contornos das barras
+    'opacity': 0.6,  # Transparência das barras
+    'textposition': 'outside',  # Números em cima das barras
+    'cliponaxis': False,  # Números da barra mais alta não são cortados
+}
+
+# Título centralizado no topo. Fica no layout da figura, não no template:
+# o tema do streamlit sobrescreve o título do template (alinhado à esquerda)
+TITLE_STYLE = {'y': 0.95, 'x': 0.5, 'xanchor': 'center', 'yanchor': 'top'}
+
+# Escala das barras coloridas por valor
+COLOR_SCALE = 'Blues'
+
+# ====================================================================
+# TEMPLATE
+# ====================================================================
+
+@lru_cache(maxsize=1)
+def template():
+    """
+    FUNÇÃO DO TEMPLATE COMPARTILHADO PELOS GRÁFICOS:
+    1. PARTE DO TEMPLATE PADRÃO DO PLOTLY NO PROCESSO (O DO STREAMLIT, QUANDO ELE ESTÁ CARREGADO)
+    2. ACRESCENTA O ESTILO DAS BARRAS (BAR_STYLE)
+    3. VALIDA UMA VEZ E GUARDA COMO DICT
+
+    As figuras recebem o dict sem nova validação (o plotly faz o mesmo com os
+    templates que distribui), em vez de copiar e validar o template a cada px.bar.
+
+    INPUT: -
+    OUTPUT: DICT DO TEMPLATE (SOMENTE LEITURA)
+    """
+    base = pio.templates[pio.templates.default] if pio.templates.default else go.layout.Template()
+    base = go.layout.Template(base)
+    base.data.bar = [go.Bar(BAR_STYLE)]
+    return base.to_plotly_json()
+
+# ====================================================================
+# BAR CHART
+# ====================================================================
+
+def bar_chart(df_aux, x, y, title, color=None, hover_name=None, value_label=None, value_format='',
+              category_order=None, **style):
+    """
+    FUNÇÃO DO GRÁFICO DE BARRAS DAS PÁGINAS:
+    1. UMA BARRA POR LINHA DE df_aux, COM O VALOR ESCRITO NA PRÓPRIA BARRA (TEXTO NATIVO, SEM TRAÇO EXTRA)
+    2. COR POR COLUNA NUMÉRICA: ESCALA CONTÍNUA (COLOR_SCALE); COR POR COLUNA DE TEXTO: UM TRAÇO POR CATEGORIA, COM LEGENDA
+    3. ESTILO VEM DO TEMPLATE COMPARTILHADO (style SOBRESCREVE, EX.: opacity, textposition)
+
+    INPUT: DATAFRAME, COLUNAS x E y, TÍTULO, COLUNA DE COR, COLUNA DO HOVER, NOME E FORMATO DO VALOR,
+           ORDEM DO EIXO x ('total descending'...), ESTILO DAS BARRAS
+    OUTPUT: FIGURA DO PLOTLY
+    """
+    value_label = value_label or y
+    hover = '<b>%{hovertext}</b><br><br>' if hover_name else ''
+    hover += f'{value_label}=%{{y{value_format}}}'
+
+    def trace(rows, **kwargs):
+        return go.Bar(x=rows[x], y=rows[y], text=rows[y],
+                      hovertext=rows[hover_name] if hover_name else None,
+                      **kwargs, **style).to_plotly_json()
+
+    layout = {'title': dict(TITLE_STYLE, text=title),
+              'xaxis': {'title': {'text': x}},
+              'yaxis': {'title': {'text': value_label}},
+              'barmode': 'relative'}
+    if category_order:
+        layout['xaxis']['categoryorder'] = category_order
+
+    if color is None:
+        data = [trace(df_aux, hovertemplate=hover + '<extra></extra>')]
+    elif color == y:
+        data = [trace(df_aux, marker={'color': df_aux[y], 'coloraxis': 'coloraxis'},
+                      hovertemplate=hover + '<extra></extra>')]
+        layout['coloraxis'] = {'colorscale': COLOR_SCALE, 'colorbar': {'title': {'text': value_label}}}
+    else:
+        data = [trace(rows, name=group, legendgroup=group,
+                      hovertemplate=hover + f'<br>{color}={group}<extra></extra>')
+                for group, rows in df_aux.groupby(color, sort=False, observed=True)]
+        layout['legend'] = {'title': {'text': color}, 'tracegroupgap': 0}
+
+    layout = go.Layout(layout).to_plotly_json()
+    layout['template'] = template()
+    # Traços e layout já validados acima; o template foi validado uma vez
+    return go.Figure({'data': data, 'layout': layout}, _validate=False)
+
+# ====================================================================
+# SERIALIZED FIGURE CACHE
+# ====================================================================
+
+def cached_figure(name, build, **selections):
+    """
+    FUNÇÃO DE FIGURA MEMOIZADA PELA SELEÇÃO (utils.cache), EX.:
+    fig = cached_figure('countries.rest_by_country', lambda: rest_by_country(cube), country=country_options)
+
+    1. GUARDA O JSON DA FIGURA (CHAVE: GRÁFICO + VERSÃO DO DATASET + SELEÇÕES)
+    2. ACERTO: REMONTA A FIGURA DO JSON SEM VALIDAR DE NOVO (build NÃO RODA)
+
+    O JSON é imutável, então nenhuma sessão altera a figura de outra. No perfil
+    da página (utils.profiler) a etapa leva o nome do gráfico.
+
+    INPUT: NOME DO GRÁFICO, FUNÇÃO QUE MONTA A FIGURA, SELEÇÕES DA SIDEBAR
+    OUTPUT: FIGURA DO PLOTLY
+    """
+    def build_json():
+        # Só roda na falta do cache: a etapa 'build' aparece no perfil só quando a figura é montada
+        with stage('build'):
+            return build().to_json()
+
+    with stage(name):
+        spec = cached(name, build_json, **selections)
+        return go.Figure(json.loads(spec), _validate=False)
@@ -0,0 +1,117 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from utils.data import load_data, per_dataset_version
+from utils.schema import decategorize
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Dimensões do cubo: todos os filtros das páginas usam um subconjunto delas
+CUBE_DIMENSIONS = ['country', 'city', 'main_cuisine', 'price_type']
+
+# Métricas aditivas guardadas em cada célula
+CUBE_METRICS = ['restaurants', 'votes', 'cost_for_two_dol', 'cost_restaurants', 'rating_tenths', 'rating_high',
+                'rating_low']
+
+# Faixas de nota usadas na página de cidades
+HIGH_RATING = 4      # nota acima de 4
+LOW_RATING = 2.5     # nota abaixo de 2.5
+
+# ====================================================================
+# BUILD
+# ====================================================================
+
+def build_cube(df):
+    """
+    FUNÇÃO DE CONSTRUÇÃO DO CUBO DE AGREGADOS:
+    1. AGRUPA POR country x city x main_cuisine x price_type (SÓ COMBINAÇÕES EXISTENTES)
+    2. GUARDA CONTAGEM, SOMAS E FAIXAS DE NOTA DE CADA CÉLULA
+
+    A nota é somada em décimos inteiros para que as médias após o roll-up
+    não acumulem erro de ponto flutuante. 'cost_restaurants' conta só as
+    linhas com custo em dólar (moeda sem taxa fica NaN e fora da soma).
+
+    INPUT: DATAFRAME PREPARADO (DEDUPLICADO)
+    OUTPUT: DATAFRAME COM UMA LINHA POR CÉLULA
+    """
+    rating = df['aggregate_rating']
+    cells = df.assign(
+        rating_tenths=np.rint(rating.to_numpy() * 10).astype('int64'),
+        rating_high=(rating > HIGH_RATING).astype('int64'),
+        rating_low=(rating < LOW_RATING).astype('int64'),
+    )
+    cube = (cells.groupby(CUBE_DIMENSIONS, observed=True)
+                 .agg(restaurants=('restaurant_id', 'size'),
+                      votes=('votes', 'sum'),
+                      cost_for_two_dol=('avg_cost_for_two_dol', 'sum'),
+                      cost_restaurants=('avg_cost_for_two_dol', 'count'),
+                      rating_tenths=('rating_tenths', 'sum'),
+                      rating_high=('rating_high', 'sum'),
+                      rating_low=('rating_low', 'sum'))
+                 .reset_index())
+
+    # Soma de uint32 vira uint64: volta para int64 para os cubos poderem ser subtraídos
+    return cube.astype({'votes': 'int64'})
+
+def merge_cubes(cubes):
+    """
+    Soma cubos parciais (ex.: um por chunk) célula a célula.
+
+    Como as métricas são aditivas, um cubo com sinal trocado desfaz a
+    contribuição de linhas já somadas; células que ficam vazias são removidas.
+    """
+    merged = (decategorize(pd.concat(cubes, ignore_index=True))
+                .groupby(CUBE_DIMENSIONS)[CUBE_METRICS].sum()
+                .reset_index())
+    return merged.loc[merged['restaurants'] != 0].reset_index(drop=True)
+
+@per_dataset_version
+def load_cube(path, rates_path):
+    """Cubo da versão atual do dataset: o gravado no store da ingestão, se houver (somente leitura)."""
+    # utils.ingest importa este módulo: import aqui dentro
+    from utils.ingest import read_store_cube, store_manifest, store_path
+
+    if store_manifest(path, rates_path) is not None:
+        return read_store_cube(store_path(path))
+    return build_cube(load_data(path, rates_path))
+
+# ====================================================================
+# QUERY
+# ====================================================================
+
+def slice_cube(cube, **selections):
+    """
+    Recorta o cubo pelas seleções da sidebar, ex.: slice_cube(cube, country=['Brazil']).
+
+    Cada seleção filtra uma dimensão com isin; o custo depende do número de células.
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    for dimension, options in selections.items():
+        mask &= cube[dimension].isin(options).to_numpy()
+    return cube.loc[mask, :]
+
+def rollup(cube, by):
+    """
+    FUNÇÃO DE ROLL-UP:
+    1. SOMA AS MÉTRICAS DAS CÉLULAS PARA AS DIMENSÕES 'by'
+    2. CALCULA AS MÉDIAS (votos, custo em dólar e nota)
+
+    INPUT: CUBO (OU RECORTE), LISTA DE DIMENSÕES
+    OUTPUT: DATAFRAME COM UMA LINHA POR GRUPO (DIMENSÕES SEM CATEGORIA)
+    """
+    agg = decategorize(cube.groupby(by, observed=True)[CUBE_METRICS].sum().reset_index())
+
+    agg['avg_votes'] = agg['votes'] / agg['restaurants']
+    agg['avg_cost_for_two_dol'] = agg['cost_for_two_dol'] / agg['cost_restaurants']
+    agg['avg_rating'] = agg['rating_tenths'] / (10 * agg['restaurants'])
+    return agg
+
+def distinct_count(cube, by, dimension):
+    """Quantos valores distintos de 'dimension' existem em cada grupo de 'by'."""
+    return decategorize(cube.groupby(by + [dimension], observed=True).size()
+                .reset_index()
+                .groupby(by, observed=True)[dimension].size()
+                .reset_index())
@@ -0,0 +1,105 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from utils.data import load_data, per_dataset_version
+
+# ====================================================================
+# BUILD
+# ====================================================================
+
+def build_cuisine_index(df):
+    """
+    FUNÇÃO DO ÍNDICE RESTAURANTE <-> CULINÁRIA:
+    1. SEPARA A LISTA 'cuisines' DE CADA RESTAURANTE UMA ÚNICA VEZ
+    2. CODIFICA CADA CULINÁRIA COMO INTEIRO (VOCABULÁRIO EM ORDEM ALFABÉTICA)
+    3. GUARDA OS PARES (LINHA, CULINÁRIA) EM FORMATO CSR: ptr[i]:ptr[i+1] SÃO AS CULINÁRIAS DA LINHA i
+
+    'Italian, Pizza, Cafe' conta para as três culinárias, não só para 'main_cuisine'.
+
+    INPUT: DATAFRAME PREPARADO
+    OUTPUT: DICT COM labels (ÍNDICE DO DATAFRAME), vocab, ptr, codes E pair_rows
+    """
+    tags = df['cuisines'].fillna('').str.split(',').explode().str.strip()
+    tags = tags.loc[tags != '']
+
+    # Posição de cada par no dataframe (explode repete o rótulo da linha)
+    pair_rows = df.index.get_indexer(tags.index).astype('int64')
+    codes, vocab = pd.factorize(tags.to_numpy(), sort=True)
+
+    # Mesma culinária repetida na lista de um restaurante conta uma vez
+    pairs = np.unique(np.column_stack([pair_rows, codes]), axis=0)
+    pair_rows, codes = pairs[:, 0], pairs[:, 1].astype('int32')
+    return {
+        'labels': df.index,
+        'vocab': np.asarray(vocab, dtype=object),
+        'ptr': np.searchsorted(pair_rows, np.arange(len(df) + 1)),
+        'codes': codes,
+        'pair_rows': pair_rows,
+    }
+
+@per_dataset_version
+def load_cuisine_index(path, rates_path):
+    """Índice de culinárias da versão atual do dataset (somente leitura)."""
+    return build_cuisine_index(load_data(path, rates_path))
+
+# ====================================================================
+# QUERY
+# ====================================================================
+
+def _pairs_in(index, df):
+    """Pares (posição da linha em df, código da culinária) das linhas de um recorte do dataset."""
+    positions = index['labels'].get_indexer(df.index)
+    in_df = np.full(len(index['labels']), -1, dtype='int64')
+    in_df[positions] = np.arange(len(df))
+    pair_pos = in_df[index['pair_rows']]
+    keep = pair_pos >= 0
+    return pair_pos[keep], index['codes'][keep]
+
+def _codes_of(index, names):
+    return np.flatnonzero(np.isin(index['vocab'], list(names)))
+
+def _row_codes(index, rows):
+    """Códigos das culinárias das linhas 'rows' lidos pelo ptr (custo proporcional à seleção)."""
+    starts = index['ptr'][rows]
+    lengths = index['ptr'][np.asarray(rows) + 1] - starts
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return index['codes'][np.repeat(starts, lengths) + offsets]
+
+def present_cuisines(index, rows):
+    """Culinárias (todas as da lista) das linhas selecionadas, na ordem em que aparecem."""
+    return index['vocab'][pd.unique(_row_codes(index, rows))].tolist()
+
+def cuisine_ratings(index, df, names=None):
+    """
+    FUNÇÃO DE AGREGAÇÃO POR CULINÁRIA:
+    1. PARES (RESTAURANTE, CULINÁRIA) DAS LINHAS DE df (SÓ AS CULINÁRIAS 'names', SE DADAS)
+    2. CONTAGEM E NOTA MÉDIA POR CULINÁRIA COM bincount (NOTA SOMADA EM DÉCIMOS, COMO NO CUBO)
+
+    INPUT: ÍNDICE, DATAFRAME FILTRADO, LISTA OPCIONAL DE CULINÁRIAS
+    OUTPUT: DATAFRAME cuisine, restaurants, votes, avg_rating (SÓ CULINÁRIAS PRESENTES)
+    """
+    pair_pos, codes = _pairs_in(index, df)
+    if names is not None:
+        keep = np.isin(codes, _codes_of(index, names))
+        pair_pos, codes = pair_pos[keep], codes[keep]
+
+    tenths = np.rint(df['aggregate_rating'].to_numpy()[pair_pos] * 10)
+    n_cuisines = len(index['vocab'])
+    restaurants = np.bincount(codes, minlength=n_cuisines)
+    rating_tenths = np.bincount(codes, weights=tenths, minlength=n_cuisines)
+    votes = np.bincount(codes, weights=df['votes'].to_numpy()[pair_pos], minlength=n_cuisines)
+
+    present = restaurants > 0
+    return pd.DataFrame({
+        'cuisine': index['vocab'][present],
+        'restaurants': restaurants[present],
+        'votes': votes[present].astype('int64'),
+        'avg_rating': rating_tenths[present] / (10 * restaurants[present]),
+    })
+
+def distinct_cuisine_count(index, df, by):
+    """Quantas culinárias distintas (não strings de 'cuisines' distintas) existem em cada grupo de 'by'."""
+    pair_pos, codes = _pairs_in(index, df)
+    pairs = df[by].iloc[pair_pos].assign(cuisine=codes)
+    return pairs.groupby(by, observed=True)['cuisine'].nunique().reset_index()
@@ -0,0 +1,89 @@
+# Libraries
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.paths import RATES_PATH
+
+# ====================================================================
+# ERRORS
+# ====================================================================
+
+class UnknownCurrencyError(KeyError):
+    """Moedas do dataset sem taxa na versão escolhida da tabela de câmbio."""
+
+    def __init__(self, unknown):
+        self.unknown = unknown
+        super().__init__(
+            'Sem taxa de câmbio para: ' +
+            ', '.join(f'{cur} ({n} linhas)' for cur, n in unknown.items()))
+
+# ====================================================================
+# RATE TABLE
+# ====================================================================
+
+# Tabela de câmbio versionada por data: colunas date, currency, rate
+# (quantas unidades da moeda valem 1 dólar)
+@lru_cache(maxsize=4)
+def _read_rate_table(path, mtime):
+    table = pd.read_csv(path, parse_dates=['date'])
+    return table.sort_values('date', kind='stable')
+
+def rate_table(path=RATES_PATH):
+    """Tabela completa (todas as versões), relida só quando o arquivo muda."""
+    return _read_rate_table(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+def load_rates(path=RATES_PATH, as_of=None):
+    """
+    FUNÇÃO DE CARGA DAS TAXAS DE CÂMBIO:
+    1. LÊ A TABELA VERSIONADA
+    2. PARA CADA MOEDA, USA A TAXA MAIS RECENTE ATÉ 'as_of' (PADRÃO: A ÚLTIMA)
+
+    INPUT: CAMINHO DO ARQUIVO, DATA DA VERSÃO (OPCIONAL)
+    OUTPUT: SERIES currency -> rate
+    """
+    table = rate_table(path)
+    if as_of is not None:
+        table = table.loc[table['date'] <= pd.Timestamp(as_of)]
+    return table.groupby('currency')['rate'].last()
+
+# ====================================================================
+# CONVERSION
+# ====================================================================
+
+def unknown_currencies(df, rates):
+    """Moedas de df sem taxa em 'rates', com a quantidade de linhas de cada uma."""
+    counts = df['currency'].value_counts()
+    return counts.loc[~counts.index.isin(rates.index)]
+
+def convert_to_dollar(df, rates=None, errors='raise'):
+    """
+    FUNÇÃO DE CONVERSÃO PARA DÓLAR (VETORIZADA):
+    1. CODIFICA 'currency' COMO CATEGORIA
+    2. BUSCA A TAXA UMA VEZ POR CATEGORIA
+    3. DIVIDE 'average_cost_for_two' PELA TAXA EM UMA OPERAÇÃO NUMPY
+
+    errors='raise' levanta UnknownCurrencyError listando as moedas sem taxa;
+    errors='coerce' deixa NaN nessas linhas.
+
+    INPUT: DATAFRAME (COLUNAS RENOMEADAS), SERIES DE TAXAS (OPCIONAL)
+    OUTPUT: DATAFRAME COM 'avg_cost_for_two_dol'
+    """
+    if rates is None:
+        rates = load_rates()
+
+    currency = df['currency'].astype('category')
+    category_rates = currency.cat.categories.map(rates).to_numpy(dtype='float64')
+
+    if errors == 'raise' and np.isnan(category_rates).any():
+        raise UnknownCurrencyError(unknown_currencies(df, rates))
+
+    # Código -1 (moeda nula) também vira NaN
+    codes = currency.cat.codes.to_numpy()
+    row_rates = np.append(category_rates, np.nan)[codes]
+
+    # Convertendo os valores e arredondando para 2 casas decimais
+    df['avg_cost_for_two_dol'] = np.round(df['average_cost_for_two'].to_numpy() / row_rates, 2)
+    return df
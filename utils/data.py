@@ -0,0 +1,318 @@
+# Libraries
+import logging
+import os
+from functools import lru_cache, wraps
+
+import inflection
+import numpy as np
+import pandas as pd
+
+from utils.currency import convert_to_dollar, load_rates, unknown_currencies
+from utils.paths import DATASET_PATH, RATES_PATH
+from utils.profiler import stage, timed
+from utils.schema import apply_schema
+from utils.snapshot import read_snapshot, snapshot_path, source_signature, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Valor usado no CSV para representar dado faltante
+NAN_SENTINEL = 'Nan '
+
+# Nome dos países e coluna
+countries = {
+1: "India",
+14: "Australia",
+30: "Brazil",
+37: "Canada",
+94: "Indonesia",
+148: "New Zeland",
+162: "Philippines",
+166: "Qatar",
+184: "Singapure",
+189: "South Africa",
+191: "Sri Lanka",
+208: "Turkey",
+214: "United Arab Emirates",
+215: "England",
+216: "United States of America",
+}
+
+# Nome das cores da avaliação
+rating_colors = {
+    "3F7E00": "darkgreen",
+    "5BA829": "green",
+    "9ACD32": "lightgreen",
+    "CDD614": "orange",
+    "FFBA00": "red",
+    "CBCBC8": "darkred",
+    "FF7800": "darkred",
+}
+
+# ====================================================================
+# FUNCTIONS
+# ====================================================================
+
+def nan_mask(df):
+    """
+    FUNÇÃO DE MARCAÇÃO DE VALORES FALTANTES:
+    1. NaN DO PRÓPRIO CSV
+    2. SENTINELA 'Nan ' (COMPARAÇÃO VETORIZADA COLUNA A COLUNA)
+
+    INPUT: DATAFRAME
+    OUTPUT: DATAFRAME BOOLEANO (MESMO SHAPE)
+    """
+    mask = df.isna()
+
+    # Só colunas de texto podem conter o sentinela
+    for col in df.columns[df.dtypes == object]:
+        mask[col] |= df[col].to_numpy() == NAN_SENTINEL
+    return mask
+
+def clean_report(df):
+    """
+    Relatório da limpeza: quantas linhas cada coluna faz excluir.
+
+    Uma linha com mais de um valor faltante conta em todas as colunas
+    envolvidas; o total de linhas excluídas fica em 'total'.
+    """
+    mask = nan_mask(df)
+    dropped = mask.any(axis=1)
+    report = mask.loc[dropped].sum()
+    report['total'] = int(dropped.sum())
+    return report.rename('dropped_rows')
+
+def clean_code(df):
+    """
+    FUNÇÃO DE DATA CLEANSING:
+    1. EXCLUSÃO LINHAS NAN (INCLUINDO O SENTINELA 'Nan ')
+
+    INPUT: DATAFRAME
+    OUTPUT: DATAFRAME
+    """
+    # Excluir linhas contendo np.nan ou 'Nan ' (take não marca o resultado como cópia de df)
+    keep = ~nan_mask(df).any(axis=1).to_numpy()
+    return df.take(np.flatnonzero(keep))
+
+def country_name(country_id):
+    return countries[country_id]
+
+def create_price_type(price_range):
+    if price_range == 1:
+        return "cheap"
+    elif price_range == 2:
+        return "normal"
+    elif price_range == 3:
+        return "expensive"
+    else:
+        return "gourmet"
+
+def color_name(color_code):
+    return rating_colors[color_code]
+
+def add_country_price_type(df):
+    """Colunas 'Country' e 'Price_type' a partir dos códigos do CSV (antes de renomear as colunas)."""
+    # Criando uma coluna com base no country code
+    df['Country'] = df['Country Code'].map(country_name)
+
+    # Tipo de Categoria de Comida e Coluna
+    df['Price_type'] = df['Price range'].map(create_price_type)
+    return df
+
+def add_main_cuisine(df):
+    """Coluna 'main_cuisine': a primeira culinária da lista 'cuisines'."""
+    # Crie a coluna 'main_cuisine' pegando apenas o primeiro valor (até a primeira vírgula) da coluna 'cuisines'
+    df['main_cuisine'] = df['cuisines'].str.split(',').str[0]
+    return df
+
+def rename_columns(dataframe):
+    df = dataframe.copy()
+    title = lambda x: inflection.titleize(x)
+    snakecase = lambda x: inflection.underscore(x)
+    spaces = lambda x: x.replace(" ", "")
+    cols_old = list(df.columns)
+    cols_old = list(map(title, cols_old))
+    cols_old = list(map(spaces, cols_old))
+    cols_new = list(map(snakecase, cols_old))
+    df.columns = cols_new
+    return df
+
+def duplicate_report(df):
+    """Quantas linhas repetem um 'restaurant_id' já visto (removidas por remove_duplicates)."""
+    return int(df['restaurant_id'].duplicated().sum())
+
+def remove_duplicates(df):
+    """
+    FUNÇÃO DE DEDUPLICAÇÃO:
+    1. MANTÉM A PRIMEIRA LINHA DE CADA 'restaurant_id'
+
+    Com uma linha por restaurante, as agregações podem contar com size/sum
+    em vez de nunique.
+
+    INPUT: DATAFRAME (COLUNAS RENOMEADAS)
+    OUTPUT: DATAFRAME
+    """
+    return df.drop_duplicates(subset='restaurant_id', keep='first')
+
+def remove_outlier(df):
+    """
+    FUNÇÃO DE REMOÇÃO DO OUTLIER:
+    1. EXCLUI A LINHA COM O MAIOR 'average_cost_for_two'
+
+    INPUT: DATAFRAME (COLUNAS RENOMEADAS)
+    OUTPUT: DATAFRAME
+    """
+    index_max = df['average_cost_for_two'].idxmax()
+    # Registro no log estruturado (utils.profiler), não no stdout a cada carga
+    outlier = df.loc[index_max]
+    logger.info('outlier removido', extra={'data': {
+        'restaurant_id': int(outlier['restaurant_id']),
+        'restaurant_name': outlier['restaurant_name'],
+        'country': outlier['country'],
+        'average_cost_for_two': float(outlier['average_cost_for_two']),
+        'currency': outlier['currency'],
+    }})
+    return df.drop(index_max)
+
+def normalize(df):
+    """
+    FUNÇÃO DE NORMALIZAÇÃO (SÓ OPERAÇÕES LINHA A LINHA, SERVE PARA CHUNKS):
+    1. DATA CLEANSING
+    2. COLUNAS 'Country' E 'Price_type'
+    3. RENOMEAR COLUNAS PARA SNAKE_CASE
+
+    INPUT: DATAFRAME BRUTO (CSV)
+    OUTPUT: DATAFRAME
+    """
+    df = timed('clean_code', clean_code, df)
+    df = add_country_price_type(df)
+    return timed('rename_columns', rename_columns, df)
+
+def enrich(df, rates=None, errors='coerce'):
+    """
+    FUNÇÃO DE COLUNAS DERIVADAS (SÓ OPERAÇÕES LINHA A LINHA, SERVE PARA CHUNKS):
+    1. CONVERSÃO PARA DÓLAR
+    2. COLUNA 'main_cuisine'
+
+    Moedas sem taxa de câmbio: com errors='coerce' (carga do dashboard) o custo
+    em dólar fica NaN e as moedas vão para o log como aviso; errors='raise'
+    (ferramentas de linha de comando) levanta UnknownCurrencyError.
+
+    INPUT: DATAFRAME NORMALIZADO, TAXAS DE CÂMBIO (OPCIONAL), errors ('coerce' OU 'raise')
+    OUTPUT: DATAFRAME
+    """
+    if rates is None:
+        rates = load_rates()
+
+    if errors == 'coerce':
+        unknown = unknown_currencies(df, rates)
+        if len(unknown):
+            logger.warning('moedas sem taxa de câmbio', extra={'data': {
+                'unknown_currencies': {str(cur): int(n) for cur, n in unknown.items()},
+            }})
+    df = timed('convert_to_dollar', convert_to_dollar, df, rates, errors=errors)
+    return add_main_cuisine(df)
+
+def prepare_data(df, rates=None, compact=True, errors='coerce'):
+    """
+    FUNÇÃO DE PREPARAÇÃO DO DATASET:
+    1. NORMALIZAÇÃO (LIMPEZA, 'country', 'price_type', SNAKE_CASE)
+    2. DEDUPLICAÇÃO POR 'restaurant_id'
+    3. REMOÇÃO DO OUTLIER
+    4. CONVERSÃO PARA DÓLAR E 'main_cuisine'
+    5. SCHEMA COMPACTO (utils.schema), EXCETO COM compact=False
+
+    INPUT: DATAFRAME BRUTO (CSV), TAXAS DE CÂMBIO (OPCIONAL, PADRÃO: ÚLTIMA VERSÃO),
+           errors DA CONVERSÃO (VER enrich)
+    OUTPUT: DATAFRAME PREPARADO
+    """
+    df = normalize(df)
+    df = timed('remove_duplicates', remove_duplicates, df)
+    df = timed('remove_outlier', remove_outlier, df)
+    df = enrich(df, rates, errors)
+    return timed('apply_schema', apply_schema, df) if compact else df
+
+# ====================================================================
+# CACHED LOADER
+# ====================================================================
+
+def dataset_version(path=DATASET_PATH, rates_path=RATES_PATH):
+    """
+    Chave da versão do dataset: caminhos, mtime e tamanho do CSV e mtime da
+    tabela de câmbio. Estruturas derivadas (cubo, índices) usam a mesma chave.
+    """
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size,
+            os.path.abspath(rates_path), os.stat(rates_path).st_mtime_ns)
+
+def per_dataset_version(build):
+    """
+    DECORADOR DOS LOADERS POR VERSÃO DO DATASET, EX.:
+    @per_dataset_version
+    def load_cube(path, rates_path):
+        return build_cube(load_data(path, rates_path))
+
+    1. CHAVE DO CACHE: dataset_version(path, rates_path) (MUDOU O CSV OU O CÂMBIO, REFAZ)
+    2. CADA VERSÃO É CONSTRUÍDA UMA VEZ POR PROCESSO (GUARDA AS 2 ÚLTIMAS)
+    3. O LOADER GANHA OS CAMINHOS PADRÃO (DATASET_PATH, RATES_PATH)
+
+    O resultado é compartilhado entre todas as páginas e sessões, por isso
+    deve ser tratado como somente leitura.
+
+    INPUT: FUNÇÃO build(path, rates_path)
+    OUTPUT: LOADER load(path=DATASET_PATH, rates_path=RATES_PATH)
+    """
+    @lru_cache(maxsize=2)
+    def cached(version):
+        # build recebe os caminhos absolutos que fazem parte da versão
+        return build(version[0], version[3])
+
+    @wraps(build)
+    def load(path=DATASET_PATH, rates_path=RATES_PATH):
+        return cached(dataset_version(path, rates_path))
+
+    load.cache_clear = cached.cache_clear
+    return load
+
+@per_dataset_version
+def load_data(path, rates_path):
+    """
+    Retorna o dataset preparado, construído uma única vez por processo.
+
+    Ordem: store da ingestão em chunks (python -m utils.ingest), snapshot
+    colunar (memory-mapped) e, se nenhum estiver em dia com o CSV, prepara a
+    partir do CSV e regrava o snapshot.
+
+    Filtrar com df.loc[...] gera cópia, sem alterar o dataset compartilhado.
+    """
+    # utils.ingest importa este módulo: import aqui dentro
+    from utils.ingest import read_store, store_manifest, store_path
+
+    # Etapas medidas pelo perfil da página que fez a carga (utils.profiler)
+    if store_manifest(path, rates_path) is not None:
+        return timed('read_store', read_store, store_path(path))
+
+    signature = source_signature(path, rates_path)
+    df = timed('read_snapshot', read_snapshot, snapshot_path(path), signature)
+    if df is None:
+        df = prepare_data(timed('read_csv', pd.read_csv, path), load_rates(rates_path))
+        with stage('write_snapshot'):
+            write_snapshot(df, snapshot_path(path), signature)
+    return df
+
+def build_snapshot(path=DATASET_PATH, rates_path=RATES_PATH, errors='raise'):
+    """
+    FUNÇÃO DE BUILD DO SNAPSHOT (python -m utils.snapshot):
+    1. PREPARA O DATASET A PARTIR DO CSV (MOEDA SEM TAXA É ERRO, SALVO errors='coerce')
+    2. GRAVA O ARQUIVO COLUNAR AO LADO DO CSV
+
+    INPUT: CAMINHO DO CSV, CAMINHO DA TABELA DE CÂMBIO, errors DA CONVERSÃO
+    OUTPUT: CAMINHO DO SNAPSHOT
+    """
+    df = prepare_data(pd.read_csv(path), load_rates(rates_path), errors=errors)
+    target = snapshot_path(path)
+    write_snapshot(df, target, source_signature(path, rates_path))
+    return target
@@ -0,0 +1,89 @@
+# Libraries
+import numpy as np
+
+from utils.cube import slice_cube
+from utils.data import load_data, per_dataset_version
+from utils.schema import decategorize
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Lados das células em graus, da visão global (~440 km) ao bairro (~5 km)
+RESOLUTIONS = [4, 1, 0.25, 0.05]
+
+# Dimensões guardadas junto da célula para os filtros da sidebar
+DENSITY_DIMENSIONS = ['country', 'price_type', 'main_cuisine']
+
+# ====================================================================
+# BUILD
+# ====================================================================
+
+def build_density(df, cell_deg):
+    """
+    FUNÇÃO DE AGREGAÇÃO GEOGRÁFICA:
+    1. CALCULA A CÉLULA QUADRADA (cell_deg GRAUS) DE CADA RESTAURANTE
+    2. AGRUPA POR CÉLULA x country x price_type x main_cuisine (SÓ COMBINAÇÕES EXISTENTES)
+    3. GUARDA CONTAGEM E SOMAS (NOTA EM DÉCIMOS E CUSTO EM DÓLAR)
+
+    As métricas são aditivas, como no cubo: depois dos filtros, cada célula
+    é somada sem voltar às linhas. 'cost_restaurants' conta só as linhas com
+    custo em dólar (moeda sem taxa fica NaN e fora da soma).
+
+    INPUT: DATAFRAME PREPARADO, LADO DA CÉLULA EM GRAUS
+    OUTPUT: DATAFRAME COM UMA LINHA POR CÉLULA E COMBINAÇÃO DE DIMENSÕES
+    """
+    cells = df.assign(
+        cell_row=np.floor((df['latitude'].to_numpy(dtype='float64') + 90) / cell_deg).astype('int64'),
+        cell_col=np.floor((df['longitude'].to_numpy(dtype='float64') + 180) / cell_deg).astype('int64'),
+        rating_tenths=np.rint(df['aggregate_rating'].to_numpy() * 10).astype('int64'),
+    )
+    return (cells.groupby(['cell_row', 'cell_col'] + DENSITY_DIMENSIONS, observed=True)
+                 .agg(restaurants=('restaurant_id', 'size'),
+                      rating_tenths=('rating_tenths', 'sum'),
+                      cost_for_two_dol=('avg_cost_for_two_dol', 'sum'),
+                      cost_restaurants=('avg_cost_for_two_dol', 'count'))
+                 .reset_index())
+
+@per_dataset_version
+def load_density(path, rates_path):
+    """Agregados de todas as resoluções da versão atual do dataset (somente leitura)."""
+    df = load_data(path, rates_path)
+    return {cell_deg: build_density(df, cell_deg) for cell_deg in RESOLUTIONS}
+
+# ====================================================================
+# QUERY
+# ====================================================================
+
+def density_cells(density, cell_deg, **selections):
+    """
+    FUNÇÃO DAS CÉLULAS DO MAPA DE DENSIDADE:
+    1. RECORTA OS AGREGADOS PELAS SELEÇÕES DA SIDEBAR (EX.: country=[...])
+    2. SOMA POR CÉLULA: CONTAGEM, NOTA MÉDIA E CUSTO MÉDIO EM DÓLAR
+    3. CULINÁRIA DOMINANTE: A DE MAIS RESTAURANTES NA CÉLULA (EMPATE: ORDEM ALFABÉTICA)
+    4. CANTOS DO QUADRADO DE CADA CÉLULA (lng, lat)
+
+    INPUT: AGREGADOS DE UMA RESOLUÇÃO, LADO DA CÉLULA, SELEÇÕES
+    OUTPUT: DATAFRAME COM UMA LINHA POR CÉLULA
+    """
+    cells = decategorize(slice_cube(density, **selections))
+    keys = ['cell_row', 'cell_col']
+
+    metrics = ['restaurants', 'rating_tenths', 'cost_for_two_dol', 'cost_restaurants']
+    agg = cells.groupby(keys)[metrics].sum().reset_index()
+    agg['avg_rating'] = agg['rating_tenths'] / (10 * agg['restaurants'])
+    agg['avg_cost_for_two_dol'] = agg['cost_for_two_dol'] / agg['cost_restaurants']
+
+    cuisines = (cells.groupby(keys + ['main_cuisine'])['restaurants'].sum().reset_index()
+                     .sort_values(keys + ['restaurants', 'main_cuisine'],
+                                  ascending=[True, True, False, True])
+                     .drop_duplicates(keys))
+    agg = agg.merge(cuisines[keys + ['main_cuisine']], on=keys, how='left')
+
+    south = agg['cell_row'].to_numpy() * cell_deg - 90
+    west = agg['cell_col'].to_numpy() * cell_deg - 180
+    north, east = south + cell_deg, west + cell_deg
+    agg['polygon'] = np.stack([np.column_stack([west, south]), np.column_stack([east, south]),
+                               np.column_stack([east, north]), np.column_stack([west, north])],
+                              axis=1).round(5).tolist()
+    return agg
@@ -0,0 +1,95 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from utils.cuisines import load_cuisine_index
+from utils.data import load_data, per_dataset_version
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Colunas com lista de linhas pré-calculada para cada valor
+FILTER_COLUMNS = [
+    'country', 'city', 'price_type', 'main_cuisine',
+    'has_table_booking', 'has_online_delivery', 'is_delivering_now', 'switch_to_order_menu',
+]
+
+# ====================================================================
+# BUILD
+# ====================================================================
+
+def _postings(codes, values):
+    """Linhas de cada valor em ordem crescente: rows[ptr[i]:ptr[i+1]] são as linhas do valor i."""
+    order = np.argsort(codes, kind='stable')
+    return {
+        'values': {value: i for i, value in enumerate(values)},
+        'labels': list(values),
+        'codes': codes,
+        'ptr': np.searchsorted(codes[order], np.arange(len(values) + 1)),
+        'rows': order.astype('int32'),
+    }
+
+def build_filter_index(df, cuisine_index):
+    """
+    FUNÇÃO DO ÍNDICE DE FILTROS:
+    1. PARA CADA COLUNA FILTRÁVEL, GUARDA AS LINHAS (POSIÇÕES) DE CADA VALOR
+    2. 'cuisines' VEM DO ÍNDICE DE CULINÁRIAS (UMA LINHA PODE TER VÁRIAS)
+
+    INPUT: DATAFRAME PREPARADO, ÍNDICE DE utils.cuisines
+    OUTPUT: DICT COM n_rows E AS LISTAS DE LINHAS POR COLUNA
+    """
+    columns = {}
+    for col in FILTER_COLUMNS:
+        codes, values = pd.factorize(df[col], sort=True)
+        columns[col] = _postings(codes.astype('int32'), list(values))
+
+    # Pares já estão em ordem de linha: a ordenação estável mantém as linhas de cada culinária crescentes
+    cuisines = _postings(cuisine_index['codes'], list(cuisine_index['vocab']))
+    cuisines['rows'] = cuisine_index['pair_rows'][cuisines['rows']].astype('int32')
+    columns['cuisines'] = cuisines
+    return {'n_rows': len(df), 'columns': columns}
+
+@per_dataset_version
+def load_filter_index(path, rates_path):
+    """Índice invertido da versão atual do dataset (somente leitura)."""
+    return build_filter_index(load_data(path, rates_path), load_cuisine_index(path, rates_path))
+
+# ====================================================================
+# QUERY
+# ====================================================================
+
+def select_rows(index, **selections):
+    """
+    FUNÇÃO DE SELEÇÃO, EX.: select_rows(index, country=['Brazil'], price_type=['cheap']):
+    1. UNE AS LISTAS DE LINHAS DOS VALORES ESCOLHIDOS EM CADA COLUNA
+    2. INTERSECTA AS COLUNAS
+
+    O custo depende do número de linhas dos valores escolhidos, não do
+    tamanho do dataset.
+
+    INPUT: ÍNDICE, SELEÇÕES POR COLUNA
+    OUTPUT: POSIÇÕES DAS LINHAS SELECIONADAS, EM ORDEM CRESCENTE (ORDEM DO DATAFRAME)
+    """
+    selected = None
+    for col, options in selections.items():
+        postings = index['columns'][col]
+        ids = [postings['values'][value] for value in options if value in postings['values']]
+        parts = [postings['rows'][postings['ptr'][i]:postings['ptr'][i + 1]] for i in ids]
+        rows = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype='int32')
+        selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+
+    if selected is None:
+        return np.arange(index['n_rows'], dtype='int32')
+    return selected
+
+def present_values(index, col, rows):
+    """Valores de 'col' que existem nas linhas selecionadas, na ordem em que aparecem."""
+    postings = index['columns'][col]
+    return [postings['labels'][code] for code in pd.unique(postings['codes'][rows])]
+
+def row_mask(index, rows):
+    """Máscara booleana (tamanho do dataset) das linhas selecionadas, para os índices espacial e de busca."""
+    mask = np.zeros(index['n_rows'], dtype=bool)
+    mask[rows] = True
+    return mask
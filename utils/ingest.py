@@ -0,0 +1,213 @@
+# Libraries
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from utils.cube import CUBE_DIMENSIONS, CUBE_METRICS, build_cube, merge_cubes
+from utils.currency import load_rates
+from utils.data import enrich, normalize
+from utils.paths import DATASET_PATH, RATES_PATH
+from utils.schema import apply_schema
+from utils.snapshot import feather, pa, source_signature
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Linhas por chunk: o pico de memória é proporcional a este valor
+DEFAULT_CHUNKSIZE = 100_000
+
+# Cubo parcial é consolidado a cada N chunks para não crescer sem limite
+MERGE_EVERY = 10
+
+MANIFEST = 'manifest.json'
+
+# Cubo de agregados gravado junto com as partes
+CUBE_FILE = 'cube.feather'
+
+# Formato do store (partes + cubo + manifest): aumentar a cada mudança no layout
+STORE_FORMAT = 3
+
+# ====================================================================
+# STORE COLUNAR EM PARTES
+# ====================================================================
+
+def store_path(source_path):
+    """Store fica ao lado do CSV: dataset/zomato.csv -> dataset/zomato.store/"""
+    return os.path.splitext(source_path)[0] + '.store'
+
+def _write_table(df, directory, name):
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    feather.write_feather(table, os.path.join(directory, name), compression='uncompressed')
+    return name
+
+def _read_table(directory, name):
+    return pa.ipc.open_file(pa.memory_map(os.path.join(directory, name), 'r')).read_all().to_pandas()
+
+def store_manifest(path=DATASET_PATH, rates_path=RATES_PATH):
+    """
+    Manifest do store do CSV, se ele existir e for da mesma versão da origem,
+    da preparação (utils.schema.PIPELINE_VERSION) e do formato do store.
+
+    Retorna None quando não há store válido (o chamador usa snapshot ou CSV).
+    """
+    if pa is None:
+        return None
+    try:
+        with open(os.path.join(store_path(path), MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format') != STORE_FORMAT or manifest.get('signature') != source_signature(path, rates_path):
+        return None
+    return manifest
+
+def read_store(directory):
+    """
+    FUNÇÃO DE LEITURA DO STORE:
+    1. LÊ AS PARTES MEMORY-MAPPED NA ORDEM DO CSV
+    2. EXCLUI AS LINHAS MARCADAS NO MANIFEST (OUTLIER)
+    3. REAPLICA O SCHEMA (CADA PARTE TEM SUAS PRÓPRIAS CATEGORIAS)
+    4. REMOVE CATEGORIAS QUE FICARAM SEM LINHAS
+
+    INPUT: DIRETÓRIO DO STORE
+    OUTPUT: DATAFRAME PREPARADO (IGUAL AO DE utils.data.prepare_data)
+    """
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    parts = [_read_table(directory, name) for name in manifest['parts']]
+    df = apply_schema(pd.concat(parts).drop(manifest['dropped_index']))
+
+    # Categorias que só existiam nas linhas excluídas saem do dtype
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+    return df
+
+def read_store_cube(directory):
+    """Cubo gravado pela ingestão, com as dimensões de volta a categorias (como em build_cube)."""
+    return _read_table(directory, CUBE_FILE).astype({col: 'category' for col in CUBE_DIMENSIONS})
+
+# ====================================================================
+# INGESTÃO EM CHUNKS
+# ====================================================================
+
+def ingest_csv(path=DATASET_PATH, rates_path=RATES_PATH, chunksize=DEFAULT_CHUNKSIZE, store=True, errors='coerce'):
+    """
+    FUNÇÃO DE INGESTÃO EM CHUNKS (MESMO PIPELINE DE prepare_data):
+    1. LÊ O CSV EM CHUNKS
+    2. NORMALIZA CADA CHUNK (LIMPEZA, 'country', 'price_type', SNAKE_CASE)
+    3. DEDUPLICA CONTRA OS 'restaurant_id' JÁ VISTOS
+    4. CONVERTE PARA DÓLAR, DERIVA 'main_cuisine' E APLICA O SCHEMA
+    5. SOMA O CHUNK NO CUBO E GRAVA UMA PARTE NO STORE COLUNAR
+    6. NO FIM, DESFAZ A CONTRIBUIÇÃO DO OUTLIER (MAIOR 'average_cost_for_two')
+    7. GRAVA O CUBO E O MANIFEST (ASSINATURA DA ORIGEM) E TROCA O STORE ATOMICAMENTE
+
+    Com um store válido, utils.data.load_data e utils.cube.load_cube leem
+    dele em vez de preparar o CSV. Um CSV sem nenhuma linha válida levanta
+    ValueError (não há dataset para o dashboard).
+
+    O pico de memória depende do chunksize, não do tamanho do arquivo; só o
+    conjunto de ids já vistos cresce com o número de restaurantes (um set: custo por
+    chunk proporcional ao chunk, não ao total de ids já vistos).
+
+    INPUT: CAMINHO DO CSV, TABELA DE CÂMBIO, LINHAS POR CHUNK, GRAVAR STORE?,
+           errors DA CONVERSÃO PARA DÓLAR (VER utils.data.enrich)
+    OUTPUT: (CUBO, RELATÓRIO DA INGESTÃO)
+    """
+    rates = load_rates(rates_path)
+    directory = store_path(path)
+    if store:
+        if pa is None:
+            raise ImportError('pyarrow é necessário para gravar o store colunar')
+        tmp_directory = directory + '.tmp'
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        os.makedirs(tmp_directory)
+
+    seen_ids = set()
+    cubes, parts = [], []
+    outlier = None
+    report = {'rows_read': 0, 'dropped_nan': 0, 'duplicates': 0, 'chunks': 0}
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        report['rows_read'] += len(chunk)
+        report['chunks'] += 1
+
+        rows = len(chunk)
+        chunk = normalize(chunk)
+        report['dropped_nan'] += rows - len(chunk)
+
+        # Deduplicação: primeira ocorrência no chunk e ainda não vista antes
+        ids = chunk['restaurant_id'].tolist()
+        seen = np.fromiter((restaurant_id in seen_ids for restaurant_id in ids), dtype=bool, count=len(ids))
+        keep = ~chunk['restaurant_id'].duplicated().to_numpy() & ~seen
+        report['duplicates'] += int((~keep).sum())
+        chunk = chunk.loc[keep]
+        seen_ids.update(chunk['restaurant_id'].tolist())
+
+        if chunk.empty:
+            continue
+
+        chunk = apply_schema(enrich(chunk, rates, errors))
+
+        # Candidato a outlier: maior custo visto até agora (primeira ocorrência, como idxmax)
+        label = chunk['average_cost_for_two'].idxmax()
+        if outlier is None or chunk.at[label, 'average_cost_for_two'] > outlier['average_cost_for_two'].iloc[0]:
+            outlier = chunk.loc[[label]]
+
+        cubes.append(build_cube(chunk))
+        if len(cubes) >= MERGE_EVERY:
+            cubes = [merge_cubes(cubes)]
+
+        if store:
+            parts.append(_write_table(chunk, tmp_directory, f'part-{len(parts):05d}.feather'))
+
+    if outlier is None:
+        if store:
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+        raise ValueError(f'Nenhuma linha válida em {path} ({report["rows_read"]} lidas, '
+                         f'{report["dropped_nan"]} com valores faltantes)')
+
+    # Desfaz a contribuição do outlier no cubo (métricas com sinal trocado)
+    removed = build_cube(outlier)
+    removed[CUBE_METRICS] = -removed[CUBE_METRICS]
+    cube = merge_cubes(cubes + [removed])
+
+    report['outlier_index'] = int(outlier.index[0])
+    report['rows_kept'] = int(cube['restaurants'].sum())
+    report['cube_cells'] = len(cube)
+
+    if store:
+        manifest = {
+            'format': STORE_FORMAT,
+            'parts': parts,
+            'cube': _write_table(cube, tmp_directory, CUBE_FILE),
+            'dropped_index': [report['outlier_index']],
+            'signature': source_signature(path, rates_path),
+            'report': report,
+        }
+        with open(os.path.join(tmp_directory, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=1)
+
+        # Troca o store antigo pelo novo de uma vez
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_directory, directory)
+        report['store'] = directory
+
+    return cube, report
+
+# ====================================================================
+# CLI: python -m utils.ingest [CAMINHO_DO_CSV] [CHUNKSIZE]
+# ====================================================================
+
+if __name__ == '__main__':
+    import sys
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATASET_PATH
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CHUNKSIZE
+    _, ingest_report = ingest_csv(csv_path, chunksize=size, errors='raise')
+    print(json.dumps(ingest_report, indent=1))
@@ -0,0 +1,360 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+# folium e pydeck são importados dentro das funções que os usam: a Home só paga
+# o import (folium ~0,4 s) quando o mapa correspondente é exibido
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Mapeamento de cores por tipo de preço
+PRICE_COLORS = {
+    "cheap": "lightgreen",
+    "normal": "blue",
+    "expensive": "orange",
+    "gourmet": "darkred"
+}
+
+# Mesmas cores em RGB para o mapa WebGL (pydeck)
+PRICE_RGB = {
+    "cheap": [144, 238, 144],
+    "normal": [56, 170, 221],
+    "expensive": [246, 151, 48],
+    "gourmet": [162, 51, 54]
+}
+
+# Backends do mapa da Home
+MAP_BACKENDS = ['Folium', 'Pydeck (WebGL)']
+
+# Vista inicial do mapa
+START_LOCATION = [20, 0]
+START_ZOOM = 2
+
+# Lado da célula de agrupamento em pixels de tela (tile de 256 px)
+CLUSTER_PX = 60
+
+# Restaurantes individuais enviados junto com os clusters (amostra fixa)
+SAMPLE_SIZE = 50
+
+# Clusters com até este número de restaurantes são enviados como marcadores individuais
+SINGLE_MAX = 3
+
+# Margem carregada em volta da área visível (fração da largura/altura de cada lado)
+PAD_FACTOR = 0.5
+
+# ====================================================================
+# VIEWPORT
+# ====================================================================
+
+def parse_bounds(bounds):
+    """
+    Converte os bounds devolvidos pelo st_folium em (sul, oeste, norte, leste).
+
+    Retorna None quando não há bounds (primeira renderização) ou quando a
+    vista cobre o mundo inteiro na horizontal.
+    """
+    if not bounds or not bounds.get('_southWest') or bounds['_southWest'].get('lat') is None:
+        return None
+    south, west = bounds['_southWest']['lat'], bounds['_southWest']['lng']
+    north, east = bounds['_northEast']['lat'], bounds['_northEast']['lng']
+    if east - west >= 360:
+        return (south, -180, north, 180)
+    # Leaflet devolve longitudes fora de [-180, 180] quando o mapa dá a volta
+    west = (west + 180) % 360 - 180
+    east = (east + 180) % 360 - 180
+    return (south, west, north, east)
+
+def pad_bounds(bounds, factor=PAD_FACTOR):
+    """
+    Amplia a área visível em 'factor' de cada lado: pequenos arrastos do mapa
+    continuam dentro da área já carregada e não pedem dados novos.
+    """
+    if bounds is None:
+        return None
+    south, west, north, east = bounds
+    width = (east - west) % 360 or 360
+    dlat, dlon = (north - south) * factor, width * factor
+    if width + 2 * dlon >= 360:
+        return (max(south - dlat, -90), -180, min(north + dlat, 90), 180)
+    west = (west - dlon + 180) % 360 - 180
+    east = (east + dlon + 180) % 360 - 180
+    return (max(south - dlat, -90), west, min(north + dlat, 90), east)
+
+def covers(loaded, bounds):
+    """True se a área carregada contém a área visível inteira (None = mundo inteiro)."""
+    if loaded is None:
+        return True
+    if bounds is None:
+        return False
+    if bounds[0] < loaded[0] or bounds[2] > loaded[2]:
+        return False
+    # Compara longitudes medidas a partir do oeste da área carregada
+    span = (loaded[3] - loaded[1]) % 360 or 360
+    return (bounds[1] - loaded[1]) % 360 + (bounds[3] - bounds[1]) % 360 <= span
+
+# ====================================================================
+# GRID CLUSTERING
+# ====================================================================
+
+def cell_size(zoom):
+    """Lado da célula em graus para um zoom (CLUSTER_PX pixels na tela)."""
+    return 360 * CLUSTER_PX / (256 * 2 ** zoom)
+
+def cell_codes(df, zoom):
+    """Código inteiro da célula da grade de cada restaurante para o zoom."""
+    size = cell_size(zoom)
+    cx = np.floor((df['longitude'].to_numpy(dtype='float64') + 180) / size).astype('int64')
+    cy = np.floor((df['latitude'].to_numpy(dtype='float64') + 90) / size).astype('int64')
+    return cy * (int(360 / size) + 2) + cx
+
+def cluster_points(df, zoom):
+    """
+    FUNÇÃO DE AGRUPAMENTO EM GRADE (NO SERVIDOR):
+    1. CALCULA A CÉLULA DE CADA RESTAURANTE PARA O ZOOM
+    2. AGRUPA POR CÉLULA: CONTAGEM E CENTRÓIDE
+
+    O número de clusters depende do zoom e da área visível, não do número
+    de restaurantes.
+
+    INPUT: DATAFRAME (latitude, longitude), ZOOM
+    OUTPUT: (DATAFRAME count, latitude, longitude POR CÉLULA,
+             ARRAY COM A CONTAGEM DA CÉLULA DE CADA RESTAURANTE)
+    """
+    cells, inverse, counts = np.unique(cell_codes(df, zoom), return_inverse=True, return_counts=True)
+    lat_sum = np.bincount(inverse, weights=df['latitude'].to_numpy(dtype='float64'), minlength=len(cells))
+    lon_sum = np.bincount(inverse, weights=df['longitude'].to_numpy(dtype='float64'), minlength=len(cells))
+    clusters = pd.DataFrame({
+        'count': counts,
+        'latitude': lat_sum / counts,
+        'longitude': lon_sum / counts,
+    })
+    return clusters, counts[inverse]
+
+def sample_points(df, n=SAMPLE_SIZE, seed=0):
+    """Amostra fixa (mesma semente) de restaurantes para mostrar junto com os clusters."""
+    if len(df) <= n:
+        return df
+    return df.sample(n=n, random_state=seed)
+
+# ====================================================================
+# FOLIUM LAYERS
+# ====================================================================
+
+def escape_html(values):
+    """Escapa &, <, >, aspas de uma coluna inteira (equivalente vetorizado de html.escape)."""
+    return (values.astype(str)
+                  .str.replace('&', '&amp;', regex=False)
+                  .str.replace('<', '&lt;', regex=False)
+                  .str.replace('>', '&gt;', regex=False)
+                  .str.replace('"', '&quot;', regex=False)
+                  .str.replace("'", '&#x27;', regex=False))
+
+def popup_html(df):
+    """Popup de cada restaurante, montado coluna a coluna (sem f-string por linha)."""
+    return ('<div style="width:250px;"><strong>' + escape_html(df['restaurant_name']) + '</strong><br>'
+            + 'Price: ' + escape_html(df['average_cost_for_two'])
+            + ' (' + escape_html(df['currency']) + ') for two<br>'
+            + 'Type: ' + escape_html(df['main_cuisine']) + '<br>'
+            + 'Rating: ' + escape_html(df['aggregate_rating']) + '/5.0<br>'
+            + 'Price Type: ' + escape_html(df['price_type']) + '</div>')
+
+def marker_colors(df):
+    """Cor do marcador pela tabela PRICE_COLORS ('blue' para tipos desconhecidos)."""
+    return df['price_type'].astype(str).map(PRICE_COLORS).fillna('blue')
+
+def marker_features(df):
+    """
+    FUNÇÃO DO PAYLOAD GEOJSON DOS MARCADORES:
+    1. COORDENADAS [lng, lat] DE TODAS AS LINHAS DE UMA VEZ (6 CASAS, ~10 cm)
+    2. POPUP HTML ESCAPADO, GERADO PELAS COLUNAS
+
+    INPUT: DATAFRAME (latitude, longitude E COLUNAS DO POPUP)
+    OUTPUT: FeatureCollection (dict)
+    """
+    coords = np.column_stack([df['longitude'].to_numpy(dtype='float64'),
+                              df['latitude'].to_numpy(dtype='float64')]).round(6).tolist()
+    popups = popup_html(df).tolist()
+    return {
+        'type': 'FeatureCollection',
+        'features': [{'type': 'Feature',
+                      'geometry': {'type': 'Point', 'coordinates': point},
+                      'properties': {'popup': popup}}
+                     for point, popup in zip(coords, popups)],
+    }
+
+def restaurant_layers(df):
+    """
+    Marcadores individuais como uma camada GeoJson por cor (no máximo quatro),
+    em vez de um folium.Marker por restaurante.
+    """
+    import folium
+
+    layers = []
+    for color, group in df.groupby(marker_colors(df), sort=True):
+        layers.append(folium.GeoJson(
+            marker_features(group),
+            name=f'restaurants_{color}',
+            marker=folium.Marker(icon=folium.Icon(color=color, icon='home', prefix='glyphicon')),
+            popup=folium.GeoJsonPopup(fields=['popup'], labels=False),
+        ))
+    return layers
+
+def cluster_marker(cluster):
+    """Círculo no centróide do cluster, com raio crescendo com a contagem."""
+    import folium
+
+    count = int(cluster['count'])
+    return folium.CircleMarker(
+        location=[cluster['latitude'], cluster['longitude']],
+        radius=8 + 4 * np.log10(count),
+        color='#1f4e79',
+        fill=True,
+        fill_opacity=0.6,
+        tooltip=f'{count} restaurants',
+    )
+
+def cluster_layer(visible, zoom=START_ZOOM):
+    """
+    FUNÇÃO DA CAMADA DE CLUSTERS:
+    1. AGRUPA EM GRADE PARA O ZOOM ATUAL
+    2. CÉLULAS PEQUENAS VIRAM MARCADORES INDIVIDUAIS; AS DEMAIS, CÍRCULOS COM CONTAGEM
+    3. ACRESCENTA UMA AMOSTRA FIXA DE RESTAURANTES (SÓ NA VISTA DE CLUSTERS)
+
+    INPUT: RESTAURANTES DA ÁREA CARREGADA (utils.spatial.within_bounds), ZOOM
+    OUTPUT: folium.FeatureGroup
+    """
+    import folium
+
+    clusters, point_counts = cluster_points(visible, zoom)
+
+    layer = folium.FeatureGroup(name='restaurants')
+    for cluster in clusters.loc[clusters['count'] > SINGLE_MAX].to_dict('records'):
+        cluster_marker(cluster).add_to(layer)
+
+    # Restaurantes individuais: os das células pequenas + amostra dos que estão em clusters
+    clustered = point_counts > SINGLE_MAX
+    singles = visible.loc[~clustered]
+    if clustered.any():
+        singles = pd.concat([singles, sample_points(visible.loc[clustered])])
+    for restaurants in restaurant_layers(singles):
+        restaurants.add_to(layer)
+    return layer
+
+def nearby_layer(nearby, point, radius_km=None):
+    """
+    FUNÇÃO DA CAMADA DE BUSCA POR PROXIMIDADE:
+    1. MARCA O PONTO DA BUSCA (E O CÍRCULO DO RAIO, SE HOUVER)
+    2. MOSTRA OS RESTAURANTES ENCONTRADOS COMO MARCADORES INDIVIDUAIS
+
+    INPUT: DATAFRAME COM O RESULTADO DA BUSCA, PONTO (lat, lon), RAIO EM KM OU None
+    OUTPUT: folium.FeatureGroup
+    """
+    import folium
+
+    layer = folium.FeatureGroup(name='nearby')
+    folium.Marker(location=list(point), tooltip='Search point',
+                  icon=folium.Icon(color='red', icon='screenshot', prefix='glyphicon')).add_to(layer)
+    if radius_km is not None:
+        folium.Circle(location=list(point), radius=radius_km * 1000, color='red', fill=False).add_to(layer)
+    for restaurants in restaurant_layers(nearby):
+        restaurants.add_to(layer)
+    return layer
+
+# ====================================================================
+# PYDECK (WEBGL)
+# ====================================================================
+
+# Tooltip do pydeck: os campos vêm das colunas enviadas em deck_data
+DECK_TOOLTIP = {
+    'html': '<b>{name}</b><br/>Type: {cuisine}<br/>Rating: {rating}/5.0',
+    'style': {'fontSize': '12px'},
+}
+
+def deck_data(df):
+    """
+    Só as colunas que a camada usa, com nomes curtos, coordenadas arredondadas
+    (5 casas, ~1 m) e a cor já resolvida, para o JSON enviado ao navegador
+    ficar pequeno (o pydeck repete os nomes das colunas em cada linha).
+    """
+    return pd.DataFrame({
+        'lng': df['longitude'].to_numpy(dtype='float64').round(5),
+        'lat': df['latitude'].to_numpy(dtype='float64').round(5),
+        'color': df['price_type'].astype(str).map(PRICE_RGB).to_numpy(),
+        'name': df['restaurant_name'].to_numpy(),
+        'cuisine': df['main_cuisine'].astype(str).to_numpy(),
+        'rating': df['aggregate_rating'].to_numpy(),
+    })
+
+def deck_map(df):
+    """
+    FUNÇÃO DO MAPA WEBGL:
+    1. MONTA OS DADOS COMPACTOS DOS RESTAURANTES
+    2. DESENHA TODOS COMO UMA ScatterplotLayer NA GPU, COM A COR DO TIPO DE PREÇO
+
+    Sem marcadores no DOM: o dataset global inteiro cabe em uma camada.
+
+    INPUT: DATAFRAME FILTRADO
+    OUTPUT: pdk.Deck
+    """
+    import pydeck as pdk
+
+    layer = pdk.Layer(
+        'ScatterplotLayer',
+        data=deck_data(df),
+        get_position='[lng, lat]',
+        get_fill_color='color',
+        get_radius=50,
+        radius_min_pixels=3,
+        radius_max_pixels=12,
+        opacity=0.8,
+        pickable=True,
+    )
+    view = pdk.ViewState(latitude=START_LOCATION[0], longitude=START_LOCATION[1], zoom=1)
+    return pdk.Deck(layers=[layer], initial_view_state=view, tooltip=DECK_TOOLTIP, map_style=None)
+
+# Tooltip do mapa de densidade (colunas de density_deck_data)
+DENSITY_TOOLTIP = {
+    'html': '<b>{restaurants} restaurants</b><br/>Avg rating: {rating}<br/>'
+            'Avg cost for two: US$ {cost}<br/>Main cuisine: {cuisine}',
+    'style': {'fontSize': '12px'},
+}
+
+def density_deck_data(cells):
+    """Células com a cor pela nota média (vermelho 2.0 -> verde 4.5) e valores já formatados."""
+    scale = np.clip((cells['avg_rating'].to_numpy() - 2.0) / 2.5, 0, 1)
+    colors = np.column_stack([255 * (1 - scale), 200 * scale, np.full(len(cells), 60), np.full(len(cells), 160)])
+    # Célula sem nenhum custo em dólar (moedas sem taxa): NaN não é JSON válido no navegador
+    cost = cells['avg_cost_for_two_dol'].round(2)
+    return pd.DataFrame({
+        'polygon': cells['polygon'].to_numpy(),
+        'color': colors.astype('int64').tolist(),
+        'restaurants': cells['restaurants'].to_numpy(),
+        'rating': cells['avg_rating'].round(2).to_numpy(),
+        'cost': cost.astype(object).where(cost.notna(), 'n/a').to_numpy(),
+        'cuisine': cells['main_cuisine'].to_numpy(),
+    })
+
+def density_deck(cells):
+    """
+    FUNÇÃO DO MAPA DE DENSIDADE:
+    1. DESENHA AS CÉLULAS PRÉ-AGREGADAS COMO QUADRADOS (PolygonLayer)
+    2. COR PELA NOTA MÉDIA; TOOLTIP COM CONTAGEM, CUSTO E CULINÁRIA DOMINANTE
+
+    INPUT: DATAFRAME DE utils.density.density_cells
+    OUTPUT: pdk.Deck
+    """
+    import pydeck as pdk
+
+    layer = pdk.Layer(
+        'PolygonLayer',
+        data=density_deck_data(cells),
+        get_polygon='polygon',
+        get_fill_color='color',
+        get_line_color=[80, 80, 80],
+        line_width_min_pixels=1,
+        pickable=True,
+    )
+    view = pdk.ViewState(latitude=START_LOCATION[0], longitude=START_LOCATION[1], zoom=1)
+    return pdk.Deck(layers=[layer], initial_view_state=view, tooltip=DENSITY_TOOLTIP, map_style=None)
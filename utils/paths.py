@@ -0,0 +1,19 @@
+# Libraries
+import os
+
+# ====================================================================
+# PATHS
+# ====================================================================
+
+# Caminhos relativos à raiz do projeto (independem do cwd do streamlit)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET_DIR = os.path.join(ROOT_DIR, 'dataset')
+DATASET_PATH = os.path.join(DATASET_DIR, 'zomato.csv')
+RATES_PATH = os.path.join(DATASET_DIR, 'exchange_rates.csv')
+IMAGES_DIR = os.path.join(ROOT_DIR, 'images')
+
+# Pasta servida pelo streamlit em app/static/ (server.enableStaticServing)
+STATIC_DIR = os.path.join(ROOT_DIR, 'static')
+
+# Log estruturado das execuções (utils.profiler)
+LOG_PATH = os.path.join(ROOT_DIR, 'logs', 'dashboard.jsonl')
@@ -0,0 +1,213 @@
+# Libraries
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from utils.paths import LOG_PATH
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Liga o perfil das execuções das páginas: FOME_ZERO_PROFILE=1 streamlit run Home.py
+PROFILE_ENV = 'FOME_ZERO_PROFILE'
+
+# Log estruturado (uma linha JSON por registro), rotacionado pelo tamanho
+LOG_MAX_BYTES = 5 * 2**20
+LOG_BACKUPS = 2
+
+# Logger raiz dos módulos do projeto (utils.data, utils.profiler...)
+LOGGER_NAME = 'utils'
+
+logger = logging.getLogger(__name__)
+
+# Execução sendo medida em cada thread (cada sessão do streamlit roda a página na sua thread)
+_local = threading.local()
+_setup_lock = threading.Lock()
+
+# ====================================================================
+# STRUCTURED LOG
+# ====================================================================
+
+class JsonLinesFormatter(logging.Formatter):
+    """Um objeto JSON por linha: hora, nível, logger, mensagem e os campos de extra={'data': {...}}."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'data', {}))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def configure_log(path=LOG_PATH):
+    """
+    Liga o log estruturado dos módulos do projeto em 'path' (uma vez por processo).
+
+    Sem esta chamada os registros INFO (ex.: o outlier removido em
+    utils.data) não vão para lugar nenhum, nem para o stdout.
+    """
+    root = logging.getLogger(LOGGER_NAME)
+    with _setup_lock:
+        if any(getattr(handler, 'fome_zero', False) for handler in root.handlers):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+        handler.setFormatter(JsonLinesFormatter())
+        handler.fome_zero = True
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        root.propagate = False
+
+def profiling_enabled():
+    """True se a variável FOME_ZERO_PROFILE está ligada (1, true, yes)."""
+    return os.environ.get(PROFILE_ENV, '').strip().lower() in ('1', 'true', 'yes')
+
+# ====================================================================
+# RUN AND STAGES
+# ====================================================================
+
+class RunProfile:
+    """Etapas medidas numa execução de uma página (na ordem em que começaram)."""
+
+    def __init__(self, page):
+        self.page = page
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+        self.stack = []
+        self.started = time.perf_counter()
+
+def current_run():
+    """Execução sendo medida nesta thread (None com o perfil desligado)."""
+    return getattr(_local, 'run', None)
+
+def start_run(page):
+    """
+    FUNÇÃO DE INÍCIO DO PERFIL DE UMA EXECUÇÃO DA PÁGINA:
+    1. SÓ FAZ ALGO COM FOME_ZERO_PROFILE LIGADA (SENÃO stage() NÃO MEDE NADA)
+    2. LIGA O LOG ESTRUTURADO E O tracemalloc (PICO DE MEMÓRIA POR ETAPA)
+    3. MARCA A EXECUÇÃO COMO ATUAL NESTA THREAD
+
+    O tracemalloc fica ligado no processo enquanto o perfil estiver em uso:
+    desligar no fim de uma execução cortaria a medição das outras sessões.
+
+    INPUT: NOME DA PÁGINA
+    OUTPUT: RunProfile (OU None COM O PERFIL DESLIGADO)
+    """
+    if not profiling_enabled():
+        _local.run = None
+        return None
+    configure_log()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    run = RunProfile(page)
+    _local.run = run
+    return run
+
+@contextmanager
+def stage(name, **fields):
+    """
+    FUNÇÃO DE MEDIÇÃO DE UMA ETAPA, EX.:
+    with stage('filter.country') as record:
+        rows = select_rows(filter_index, country=country_options)
+        record['rows'] = len(rows)
+
+    1. TEMPO (perf_counter) E PICO DE MEMÓRIA ALOCADA DURANTE A ETAPA (tracemalloc)
+    2. ETAPAS ANINHADAS GUARDAM A PROFUNDIDADE; O PICO DA ETAPA DE FORA INCLUI O DAS DE DENTRO
+    3. SEM EXECUÇÃO ATUAL (PERFIL DESLIGADO, BENCHMARK...) SÓ ENTREGA O DICT, SEM MEDIR
+
+    O tracemalloc é do processo: com várias sessões rodando ao mesmo tempo o
+    pico inclui alocações das outras threads.
+
+    INPUT: NOME DA ETAPA, CAMPOS EXTRAS DO REGISTRO
+    OUTPUT: DICT DO REGISTRO (A ETAPA PODE PREENCHER 'rows' E OUTROS CAMPOS)
+    """
+    record = dict(fields)
+    run = current_run()
+    if run is None:
+        yield record
+        return
+
+    # Registro entra na ordem de início: etapas aninhadas ficam logo abaixo da etapa de fora
+    entry = {'stage': name, 'depth': len(run.stack)}
+    run.records.append(entry)
+    frame = {'peak': 0}
+    if tracemalloc.is_tracing():
+        frame['start'] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    run.stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        seconds = time.perf_counter() - start
+        run.stack.pop()
+        peak_bytes = None
+        if 'start' in frame and tracemalloc.is_tracing():
+            # Etapas de dentro zeram o pico do tracemalloc: vale o maior dos dois
+            peak = max(tracemalloc.get_traced_memory()[1], frame['peak'])
+            peak_bytes = max(peak - frame['start'], 0)
+            if run.stack:
+                run.stack[-1]['peak'] = max(run.stack[-1]['peak'], peak)
+        entry.update(record, seconds=round(seconds, 6), peak_bytes=peak_bytes)
+
+def timed(name, fn, *args, **kwargs):
+    """Chama fn(*args, **kwargs) dentro de stage(name); o número de linhas vem de len() do resultado."""
+    with stage(name) as record:
+        result = fn(*args, **kwargs)
+        if hasattr(result, '__len__') and not isinstance(result, (str, dict)):
+            record['rows'] = len(result)
+    return result
+
+def finish_run(run):
+    """
+    FUNÇÃO DE FIM DO PERFIL DA EXECUÇÃO:
+    1. GRAVA UM REGISTRO POR ETAPA NO LOG ESTRUTURADO (LOG_PATH) E UM COM O TOTAL
+    2. MOSTRA O PAINEL DE DEBUG NA SIDEBAR (ETAPAS E CACHE DE RESULTADOS)
+
+    INPUT: RunProfile DE start_run (None: NADA A FAZER)
+    OUTPUT: LISTA DE REGISTROS DAS ETAPAS
+    """
+    if run is None:
+        return []
+    _local.run = None
+
+    total = round(time.perf_counter() - run.started, 6)
+    for record in run.records:
+        logger.info('stage', extra={'data': dict(record, run=run.run_id, page=run.page)})
+    logger.info('run', extra={'data': {'run': run.run_id, 'page': run.page, 'seconds': total,
+                                       'stages': len(run.records)}})
+
+    profile_panel(run.records, total)
+    return run.records
+
+# ====================================================================
+# DEBUG PANEL
+# ====================================================================
+
+def profile_panel(records, total):
+    """Painel 'Profiler' na sidebar: etapas da execução (tempo, linhas, pico de memória) e o cache de resultados."""
+    import pandas as pd
+    import streamlit as st
+
+    from utils.cache import cache_stats
+
+    table = pd.DataFrame(records, columns=['stage', 'depth', 'seconds', 'rows', 'peak_bytes'])
+    # Marcador mostra as etapas aninhadas (ex.: read_csv dentro de load_data)
+    table['stage'] = ['· ' * depth + name for name, depth in zip(table['stage'], table['depth'])]
+    table['peak_mb'] = (table['peak_bytes'].astype(float) / 2**20).round(2)
+
+    with st.sidebar.expander('Profiler', expanded=False):
+        st.caption(f'Run: {total:.3f} s — log: {LOG_PATH}')
+        st.dataframe(table[['stage', 'seconds', 'rows', 'peak_mb']], use_container_width=True, hide_index=True)
+        st.caption('Result cache')
+        st.json(cache_stats())
@@ -0,0 +1,92 @@
+# Libraries
+import numpy as np
+
+from utils.data import load_data, per_dataset_version
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Ordenações pré-calculadas do dataset: coluna principal e desempate (ambas decrescentes)
+ORDERINGS = {
+    'rating': ('aggregate_rating', 'votes'),
+    'votes': ('votes', 'aggregate_rating'),
+}
+
+# ====================================================================
+# TOP-N EM RESULTADOS AGREGADOS
+# ====================================================================
+
+def top_n(df, by, n, ascending=False, tiebreak='votes'):
+    """
+    FUNÇÃO DE TOP-N POR SELEÇÃO PARCIAL:
+    1. ACHA O N-ÉSIMO VALOR COM np.partition (O(n), SEM ORDENAR TUDO)
+    2. ORDENA SÓ OS CANDIDATOS (VALORES ATÉ O N-ÉSIMO, INCLUINDO EMPATES)
+    3. DESEMPATE: MAIS 'tiebreak' PRIMEIRO, DEPOIS A ORDEM ORIGINAL
+
+    INPUT: DATAFRAME, COLUNA, N, ORDEM CRESCENTE?, COLUNA DE DESEMPATE (OU None)
+    OUTPUT: AS N PRIMEIRAS LINHAS, JÁ ORDENADAS
+    """
+    key = df[by].to_numpy(dtype='float64')
+    if not ascending:
+        key = -key
+
+    if n < len(key):
+        threshold = np.partition(key, n - 1)[n - 1]
+        candidates = np.flatnonzero(key <= threshold)
+    else:
+        candidates = np.arange(len(key))
+
+    # lexsort usa a última chave como principal: valor, desempate, posição original
+    keys = [candidates]
+    if tiebreak is not None:
+        keys.append(-df[tiebreak].to_numpy(dtype='float64')[candidates])
+    keys.append(key[candidates])
+    order = candidates[np.lexsort(keys)]
+    return df.iloc[order[:n]]
+
+# ====================================================================
+# ORDENAÇÕES PRÉ-CALCULADAS DOS RESTAURANTES
+# ====================================================================
+
+def build_ranking(df):
+    """
+    FUNÇÃO DAS ORDENAÇÕES PRÉ-CALCULADAS:
+    1. ORDENA O DATASET UMA VEZ POR ORDENAÇÃO (NOTA/VOTOS) COM DESEMPATE E ORDEM ORIGINAL
+    2. GUARDA A POSIÇÃO (rank) DE CADA LINHA EM CADA ORDENAÇÃO
+
+    Qualquer seleção de linhas (país, culinária...) herda a ordem pelo rank,
+    então o top-N de uma seleção não precisa ordenar a seleção.
+
+    INPUT: DATAFRAME PREPARADO
+    OUTPUT: DICT ordenação -> rank (int32, POSIÇÃO DA LINHA NA ORDENAÇÃO)
+    """
+    ranking = {}
+    for name, (primary, secondary) in ORDERINGS.items():
+        order = np.lexsort((np.arange(len(df)),
+                            -df[secondary].to_numpy(dtype='float64'),
+                            -df[primary].to_numpy(dtype='float64')))
+        rank = np.empty(len(df), dtype='int32')
+        rank[order] = np.arange(len(df), dtype='int32')
+        ranking[name] = rank
+    return ranking
+
+@per_dataset_version
+def load_ranking(path, rates_path):
+    """Ordenações da versão atual do dataset (somente leitura)."""
+    return build_ranking(load_data(path, rates_path))
+
+def top_rows(ranking, rows, n, ordering='rating'):
+    """
+    Top-N de uma seleção de linhas (posições do dataset, ex.: utils.filters.select_rows).
+
+    Seleciona os N menores ranks com argpartition (O(seleção)) e ordena só
+    esses N. Retorna posições DENTRO de 'rows', para usar com df.iloc no
+    dataframe já filtrado.
+    """
+    rank = ranking[ordering][rows]
+    if n < len(rank):
+        local = np.argpartition(rank, n - 1)[:n]
+    else:
+        local = np.arange(len(rank))
+    return local[np.argsort(rank[local])]
@@ -0,0 +1,95 @@
+# Libraries
+import hashlib
+import json
+
+import pandas as pd
+
+# ====================================================================
+# SCHEMA DO DATASET PREPARADO
+# ====================================================================
+
+# Colunas não listadas (ids, nomes, endereços, custos) mantêm o dtype original
+SCHEMA = {
+    # Texto repetitivo: categoria
+    'country': 'category',
+    'city': 'category',
+    'currency': 'category',
+    'price_type': 'category',
+    'rating_text': 'category',
+    'rating_color': 'category',
+    'main_cuisine': 'category',
+    'locality': 'category',
+
+    # Flags 0/1 e faixa de preço 1-4
+    'has_table_booking': 'int8',
+    'has_online_delivery': 'int8',
+    'is_delivering_now': 'int8',
+    'switch_to_order_menu': 'int8',
+    'price_range': 'int8',
+
+    # Coordenadas (float32 dá ~1 m de precisão). 'aggregate_rating' fica em
+    # float64: em float32 a nota 4.6 vira 4.599999904632568 nos rótulos e tabelas
+    'latitude': 'float32',
+    'longitude': 'float32',
+
+    # Contagem não negativa
+    'votes': 'uint32',
+}
+
+# Versão da preparação (utils.data.prepare_data): aumentar a cada mudança que
+# altere o dataset preparado, para invalidar snapshot, store e índices gravados
+PIPELINE_VERSION = 1
+
+# ====================================================================
+# FUNCTIONS
+# ====================================================================
+
+def apply_schema(df):
+    """
+    FUNÇÃO DE TIPAGEM COMPACTA:
+    1. APLICA O SCHEMA ÀS COLUNAS PRESENTES NO DATAFRAME
+
+    INPUT: DATAFRAME PREPARADO
+    OUTPUT: DATAFRAME TIPADO
+    """
+    return df.astype({col: dtype for col, dtype in SCHEMA.items() if col in df.columns})
+
+def pipeline_signature():
+    """Versão da preparação + hash do SCHEMA (entra na assinatura dos arquivos derivados do CSV)."""
+    schema = json.dumps(SCHEMA, sort_keys=True).encode()
+    return {'pipeline_version': PIPELINE_VERSION, 'schema': hashlib.sha1(schema).hexdigest()[:12]}
+
+def decategorize(df):
+    """
+    Volta as colunas categóricas para o tipo dos valores (ex.: object).
+
+    Usado em resultados pequenos (agregados) antes de irem para o plotly, que
+    agrupa pela coluna de cor e falha com categorias não observadas.
+    """
+    return df.astype({col: df[col].cat.categories.dtype
+                      for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+def memory_report(before, after):
+    """
+    Relatório de memória por coluna (bytes, contando o conteúdo das strings)
+    antes e depois da tipagem, com uma linha 'total' no final.
+    """
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'bytes_before': before.memory_usage(index=False, deep=True),
+        'dtype_after': after.dtypes.astype(str),
+        'bytes_after': after.memory_usage(index=False, deep=True),
+    })
+    report.loc['total'] = ['', report['bytes_before'].sum(), '', report['bytes_after'].sum()]
+    report['saving_pct'] = (100 * (1 - report['bytes_after'] / report['bytes_before'])).round(1)
+    return report
+
+# ====================================================================
+# RELATÓRIO: python -m utils.schema
+# ====================================================================
+
+if __name__ == '__main__':
+    from utils.data import DATASET_PATH, prepare_data
+
+    untyped = prepare_data(pd.read_csv(DATASET_PATH), compact=False)
+    print(memory_report(untyped, apply_schema(untyped)).to_string())
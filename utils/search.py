@@ -0,0 +1,175 @@
+# Libraries
+import json
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from utils.data import load_data, per_dataset_version
+from utils.snapshot import source_signature
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Campos indexados e peso de cada um no ranking
+SEARCH_FIELDS = {
+    'restaurant_name': 3,
+    'cuisines': 2,
+    'locality': 1,
+    'city': 1,
+}
+
+# Bônus quando o termo é a palavra inteira (e não só o prefixo)
+EXACT_BONUS = 1
+
+TOKEN_PATTERN = r'[0-9a-z]+'
+
+# Formato do índice gravado: aumentar a cada mudança em build_search_index ou na tokenização
+SEARCH_INDEX_VERSION = 1
+
+# ====================================================================
+# TOKENS
+# ====================================================================
+
+def normalize_text(values):
+    """Minúsculas e sem acentos, para uma coluna inteira ('São Paulo' -> 'sao paulo')."""
+    return (values.astype(str)
+                  .str.normalize('NFKD')
+                  .str.encode('ascii', 'ignore')
+                  .str.decode('ascii')
+                  .str.lower())
+
+def tokenize(text):
+    """Tokens de um texto digitado na busca, com a mesma normalização do índice."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    return re.findall(TOKEN_PATTERN, text)
+
+def _field_tokens(values):
+    """Lista de tokens por linha; colunas categóricas são tokenizadas uma vez por categoria."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        per_category = normalize_text(values.cat.categories.to_series()).str.findall(TOKEN_PATTERN).to_numpy()
+        codes = values.cat.codes.to_numpy()
+        return pd.Series([[] if code < 0 else per_category[code] for code in codes], dtype=object)
+    return normalize_text(values.fillna('')).str.findall(TOKEN_PATTERN).reset_index(drop=True)
+
+# ====================================================================
+# BUILD
+# ====================================================================
+
+def search_index_path(source_path):
+    """Índice fica ao lado do CSV: dataset/zomato.csv -> dataset/zomato.search.npz"""
+    return os.path.splitext(source_path)[0] + '.search.npz'
+
+def search_signature(path, rates_path):
+    """
+    Versão do índice gravado: origem e preparação (source_signature), formato
+    do índice, campos indexados com os pesos e padrão dos tokens.
+    """
+    return dict(source_signature(path, rates_path), search_index_version=SEARCH_INDEX_VERSION,
+                search_fields=SEARCH_FIELDS, token_pattern=TOKEN_PATTERN)
+
+def build_search_index(df):
+    """
+    FUNÇÃO DE CONSTRUÇÃO DO ÍNDICE INVERTIDO:
+    1. TOKENIZA NOME, CULINÁRIAS (LISTA COMPLETA), LOCALIDADE E CIDADE
+    2. GUARDA, PARA CADA TOKEN, AS LINHAS ONDE ELE APARECE E O MAIOR PESO DE CAMPO
+    3. ORDENA O VOCABULÁRIO: TODOS OS TOKENS COM UM PREFIXO FICAM CONTÍGUOS
+
+    INPUT: DATAFRAME PREPARADO
+    OUTPUT: DICT COM vocab, ptr (INÍCIO DE CADA TOKEN), rows E weights (POSIÇÕES NO DATAFRAME)
+    """
+    postings = []
+    for field, weight in SEARCH_FIELDS.items():
+        tokens = _field_tokens(df[field]).explode().dropna()
+        postings.append(pd.DataFrame({'token': tokens.to_numpy(dtype=str),
+                                      'row': tokens.index.to_numpy(dtype='int64'),
+                                      'weight': weight}))
+
+    postings = (pd.concat(postings, ignore_index=True)
+                  .groupby(['token', 'row'])['weight'].max()
+                  .reset_index())
+    vocab, starts = np.unique(postings['token'].to_numpy(dtype=str), return_index=True)
+    return {
+        'vocab': vocab,
+        'ptr': np.append(starts, len(postings)).astype('int64'),
+        'rows': postings['row'].to_numpy(dtype='int32'),
+        'weights': postings['weight'].to_numpy(dtype='int8'),
+        'n_rows': len(df),
+    }
+
+def write_search_index(index, path, signature):
+    """Grava o índice com a assinatura da origem; disco somente leitura não é erro."""
+    tmp_path = path + '.tmp.npz'
+    try:
+        np.savez(tmp_path, signature=np.array(json.dumps(signature)), **index)
+        os.replace(tmp_path, path)
+    except OSError:
+        return False
+    return True
+
+def read_search_index(path, signature):
+    """Lê o índice gravado se ele for da mesma versão (search_signature); senão None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as stored:
+            if json.loads(str(stored['signature'])) != signature:
+                return None
+            index = {key: stored[key] for key in ('vocab', 'ptr', 'rows', 'weights')}
+            index['n_rows'] = int(stored['n_rows'])
+            return index
+    except (OSError, ValueError, KeyError):
+        return None
+
+@per_dataset_version
+def load_search_index(path, rates_path):
+    """Índice da versão atual do dataset: lido do disco ou construído e gravado uma vez."""
+    index_path = search_index_path(path)
+    signature = search_signature(path, rates_path)
+    index = read_search_index(index_path, signature)
+    if index is None:
+        index = build_search_index(load_data(path, rates_path))
+        write_search_index(index, index_path, signature)
+    return index
+
+# ====================================================================
+# QUERY
+# ====================================================================
+
+def search(index, query, mask=None):
+    """
+    FUNÇÃO DE BUSCA:
+    1. CADA TERMO DIGITADO CASA COM OS TOKENS QUE COMEÇAM POR ELE (FAIXA DO VOCABULÁRIO)
+    2. A LINHA PRECISA CASAR COM TODOS OS TERMOS
+    3. PONTUAÇÃO: SOMA DO MAIOR PESO DE CAMPO DE CADA TERMO (+ BÔNUS SE A PALAVRA É EXATA)
+
+    INPUT: ÍNDICE, TEXTO DA BUSCA, MÁSCARA OPCIONAL (FILTROS DA SIDEBAR)
+    OUTPUT: (POSIÇÕES DAS LINHAS, PONTUAÇÕES), DA MAIOR PONTUAÇÃO PARA A MENOR
+    """
+    terms = tokenize(query)
+    if not terms:
+        return np.empty(0, dtype='int64'), np.empty(0, dtype='int64')
+
+    vocab, ptr = index['vocab'], index['ptr']
+    scores = np.zeros(index['n_rows'], dtype='int64')
+    matched = np.ones(index['n_rows'], dtype=bool) if mask is None else mask.copy()
+
+    for term in terms:
+        # '{' vem logo depois de 'z': a faixa cobre todos os tokens com esse prefixo
+        lo, hi = np.searchsorted(vocab, [term, term + '{'])
+        rows = index['rows'][ptr[lo]:ptr[hi]]
+        weights = index['weights'][ptr[lo]:ptr[hi]].astype('int64')
+        if lo < hi and vocab[lo] == term:
+            weights[:ptr[lo + 1] - ptr[lo]] += EXACT_BONUS
+
+        term_scores = np.zeros(index['n_rows'], dtype='int64')
+        np.maximum.at(term_scores, rows, weights)
+        matched &= term_scores > 0
+        scores += term_scores
+
+    rows = np.flatnonzero(matched)
+    order = np.argsort(-scores[rows], kind='stable')
+    return rows[order], scores[rows][order]
@@ -0,0 +1,95 @@
+# Libraries
+import json
+import os
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # sem pyarrow o dashboard continua lendo direto do CSV
+    pa = feather = None
+
+from utils.schema import pipeline_signature
+
+# ====================================================================
+# COLUMNAR SNAPSHOT (ARROW IPC / FEATHER V2)
+# ====================================================================
+
+# Chave dos metadados do arquivo onde fica a assinatura da origem
+SIGNATURE_KEY = b'fome_zero.source'
+
+def snapshot_path(source_path):
+    """Snapshot fica ao lado do CSV: dataset/zomato.csv -> dataset/zomato.feather"""
+    return os.path.splitext(source_path)[0] + '.feather'
+
+def source_signature(source_path, rates_path):
+    """
+    Identifica a versão da origem (CSV + tabela de câmbio) e da preparação
+    (PIPELINE_VERSION + SCHEMA) usada no snapshot.
+    """
+    source = os.stat(source_path)
+    return {
+        'source_mtime_ns': source.st_mtime_ns,
+        'source_size': source.st_size,
+        'rates_mtime_ns': os.stat(rates_path).st_mtime_ns,
+        **pipeline_signature(),
+    }
+
+def write_snapshot(df, path, signature):
+    """
+    FUNÇÃO DE GRAVAÇÃO DO SNAPSHOT:
+    1. CONVERTE O DATAFRAME PREPARADO PARA ARROW (ÍNDICE E CATEGORIAS PRESERVADOS)
+    2. GRAVA A ASSINATURA DA ORIGEM NOS METADADOS
+    3. GRAVA SEM COMPRESSÃO (PERMITE LEITURA MEMORY-MAPPED) E TROCA O ARQUIVO ATOMICAMENTE
+
+    INPUT: DATAFRAME PREPARADO, CAMINHO, ASSINATURA
+    OUTPUT: True SE GRAVOU
+    """
+    if pa is None:
+        return False
+
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SIGNATURE_KEY] = json.dumps(signature).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    tmp_path = path + '.tmp'
+    try:
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+    except OSError:
+        # Disco somente leitura: segue sem snapshot
+        return False
+    return True
+
+def read_snapshot(path, signature):
+    """
+    Lê o snapshot memory-mapped se ele existir e for da mesma versão da origem
+    e da preparação (um snapshot de uma versão anterior do código é ignorado).
+
+    Colunas numéricas sem nulos continuam apontando para o arquivo mapeado
+    (zero-copy, somente leitura); texto e categorias são convertidos para o
+    pandas, ou seja, copiados.
+
+    Retorna None quando não há snapshot válido (o chamador reconstrói do CSV).
+    """
+    if pa is None or not os.path.exists(path):
+        return None
+
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+        stored = (reader.schema.metadata or {}).get(SIGNATURE_KEY)
+        if stored is None or json.loads(stored) != signature:
+            return None
+        # Um bloco por coluna: sem consolidar, as colunas numéricas não são copiadas
+        return reader.read_all().to_pandas(split_blocks=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+# ====================================================================
+# BUILD STEP: python -m utils.snapshot
+# ====================================================================
+
+if __name__ == '__main__':
+    from utils.data import build_snapshot
+
+    print(build_snapshot())
@@ -0,0 +1,169 @@
+# Libraries
+import math
+
+import numpy as np
+from haversine import Unit, haversine_vector
+
+from utils.data import load_data, per_dataset_version
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Lado da célula da grade em graus (~28 km no equador)
+CELL_DEG = 0.25
+
+# Raio médio da Terra usado pelo pacote haversine
+EARTH_RADIUS_KM = 6371.0088
+
+# Metade da circunferência: nenhum ponto fica mais longe que isso
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180
+
+# ====================================================================
+# BUILD
+# ====================================================================
+
+def _grid_cells(lat, lon, cell_deg):
+    # Longitude 180 cai na mesma coluna que -180
+    n_cols = int(math.ceil(360 / cell_deg))
+    rows = np.floor((lat + 90) / cell_deg).astype('int64')
+    cols = np.mod(np.floor((lon + 180) / cell_deg).astype('int64'), n_cols)
+    return rows, cols, n_cols
+
+def build_index(df, cell_deg=CELL_DEG):
+    """
+    FUNÇÃO DE CONSTRUÇÃO DO ÍNDICE ESPACIAL (GRADE LAT/LON):
+    1. CALCULA A CÉLULA DE CADA RESTAURANTE
+    2. ORDENA AS LINHAS POR CÉLULA E GUARDA ONDE CADA CÉLULA COMEÇA E TERMINA
+
+    Uma consulta só calcula o haversine das linhas das células que cobrem o
+    raio, em vez de todas as linhas do dataset.
+
+    INPUT: DATAFRAME PREPARADO (latitude, longitude)
+    OUTPUT: DICT COM A GRADE (POSIÇÕES DAS LINHAS NO DATAFRAME DE ORIGEM)
+    """
+    lat = df['latitude'].to_numpy(dtype='float64')
+    lon = df['longitude'].to_numpy(dtype='float64')
+    rows, cols, n_cols = _grid_cells(lat, lon, cell_deg)
+    codes = rows * n_cols + cols
+
+    order = np.argsort(codes, kind='stable')
+    cells, starts = np.unique(codes[order], return_index=True)
+    return {
+        'cell_deg': cell_deg,
+        'n_cols': n_cols,
+        'cells': cells,
+        'starts': starts,
+        'ends': np.append(starts[1:], len(order)),
+        'order': order,
+        'coords': np.column_stack([lat, lon]),
+    }
+
+@per_dataset_version
+def load_index(path, rates_path):
+    """Índice espacial da versão atual do dataset (somente leitura)."""
+    return build_index(load_data(path, rates_path))
+
+# ====================================================================
+# QUERY
+# ====================================================================
+
+def _box_rows(index, south, north, west, east):
+    """Linhas das células que cobrem o retângulo (oeste > leste: cruza o antimeridiano)."""
+    cell_deg, n_cols = index['cell_deg'], index['n_cols']
+    rows = np.arange(math.floor((south + 90) / cell_deg), math.floor((north + 90) / cell_deg) + 1)
+    col_lo = math.floor((west + 180) / cell_deg)
+    col_hi = math.floor((east + 180) / cell_deg)
+    if col_hi < col_lo:
+        col_hi += n_cols
+    # Colunas fora de [0, n_cols) dão a volta no antimeridiano
+    cols = np.unique(np.mod(np.arange(col_lo, min(col_hi, col_lo + n_cols - 1) + 1), n_cols))
+    wanted = (rows[:, None] * n_cols + cols[None, :]).ravel()
+
+    # Só as células que existem no índice (a maioria da grade é vazia)
+    found = np.searchsorted(index['cells'], wanted)
+    hit = found < len(index['cells'])
+    hit[hit] = index['cells'][found[hit]] == wanted[hit]
+    found = found[hit]
+    if not len(found):
+        return np.empty(0, dtype='int64')
+    return np.concatenate([index['order'][s:e] for s, e in zip(index['starts'][found], index['ends'][found])])
+
+def _candidates(index, lat, lon, radius_km):
+    """Linhas das células que cobrem o retângulo em volta do círculo."""
+    dlat = radius_km / KM_PER_DEG
+    south, north = max(lat - dlat, -90), min(lat + dlat, 90)
+
+    # Longitude: o grau encolhe com o cosseno da latitude mais próxima do polo
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    dlon = 180 if cos_lat < 1e-9 else min(radius_km / (KM_PER_DEG * cos_lat), 180)
+    if dlon >= 180:
+        return _box_rows(index, south, north, -180, 180)
+    return _box_rows(index, south, north, lon - dlon, lon + dlon)
+
+def _distances(index, rows, lat, lon):
+    return haversine_vector([lat, lon], index['coords'][rows], Unit.KILOMETERS, comb=True).ravel()
+
+def within_radius(index, lat, lon, radius_km, mask=None):
+    """
+    FUNÇÃO DE BUSCA POR RAIO:
+    1. JUNTA AS LINHAS DAS CÉLULAS QUE COBREM O RAIO
+    2. CALCULA O HAVERSINE SÓ DESSAS LINHAS E MANTÉM AS QUE ESTÃO DENTRO
+
+    INPUT: ÍNDICE, PONTO (lat, lon), RAIO EM KM, MÁSCARA OPCIONAL (FILTROS DA SIDEBAR)
+    OUTPUT: (POSIÇÕES DAS LINHAS, DISTÂNCIAS EM KM), DA MAIS PRÓXIMA PARA A MAIS DISTANTE
+    """
+    rows = _candidates(index, lat, lon, radius_km)
+    if mask is not None:
+        rows = rows[mask[rows]]
+    if not len(rows):
+        return rows, np.empty(0)
+    distances = _distances(index, rows, lat, lon)
+    inside = distances <= radius_km
+    rows, distances = rows[inside], distances[inside]
+    order = np.argsort(distances, kind='stable')
+    return rows[order], distances[order]
+
+def within_bounds(index, bounds, mask=None):
+    """
+    FUNÇÃO DE BUSCA POR ÁREA (VIEWPORT DO MAPA):
+    1. JUNTA AS LINHAS DAS CÉLULAS QUE COBREM O RETÂNGULO
+    2. MANTÉM SÓ AS QUE ESTÃO DENTRO DE (sul, oeste, norte, leste)
+
+    INPUT: ÍNDICE, BOUNDS (sul, oeste, norte, leste) OU None (MUNDO INTEIRO), MÁSCARA OPCIONAL
+    OUTPUT: POSIÇÕES DAS LINHAS, EM ORDEM CRESCENTE
+    """
+    if bounds is None:
+        rows = np.arange(len(index['order']))
+        return rows if mask is None else rows[mask]
+
+    south, west, north, east = bounds
+    rows = _box_rows(index, south, north, west, east)
+    if mask is not None:
+        rows = rows[mask[rows]]
+    lat, lon = index['coords'][rows, 0], index['coords'][rows, 1]
+    inside = (lat >= south) & (lat <= north)
+    # Vista que cruza o antimeridiano (oeste > leste)
+    inside &= ((lon >= west) & (lon <= east)) if west <= east else ((lon >= west) | (lon <= east))
+    return np.sort(rows[inside])
+
+def nearest(index, lat, lon, k=10, mask=None):
+    """
+    FUNÇÃO DOS K VIZINHOS MAIS PRÓXIMOS:
+    1. BUSCA POR RAIO COMEÇANDO PELO TAMANHO DE UMA CÉLULA
+    2. DOBRA O RAIO ATÉ ACHAR K RESTAURANTES (OU COBRIR O GLOBO)
+
+    Tudo que está fora do raio está mais longe que tudo que está dentro, então
+    os k primeiros da busca por raio são os k mais próximos.
+
+    INPUT: ÍNDICE, PONTO (lat, lon), K, MÁSCARA OPCIONAL (FILTROS DA SIDEBAR)
+    OUTPUT: (POSIÇÕES DAS LINHAS, DISTÂNCIAS EM KM), DA MAIS PRÓXIMA PARA A MAIS DISTANTE
+    """
+    radius_km = index['cell_deg'] * KM_PER_DEG
+    while True:
+        rows, distances = within_radius(index, lat, lon, radius_km, mask)
+        if len(rows) >= k or radius_km >= MAX_DISTANCE_KM:
+            return rows[:k], distances[:k]
+        radius_km = min(2 * radius_km, MAX_DISTANCE_KM)
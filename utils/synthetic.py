@@ -0,0 +1,275 @@
+# Libraries
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.currency import UnknownCurrencyError, load_rates, unknown_currencies
+from utils.data import NAN_SENTINEL, countries, nan_mask
+from utils.paths import DATASET_PATH, RATES_PATH
+from utils.snapshot import pa
+
+# ====================================================================
+# CONSTANTS
+# ====================================================================
+
+# Linhas geradas por bloco: cada bloco tem sua própria semente (seed, nº do bloco),
+# então o arquivo só depende de seed e do total de linhas, e a memória, só do bloco
+BLOCK_ROWS = 100_000
+
+# Maior quantidade de culinárias num restaurante do dataset real
+MAX_CUISINES = 8
+
+# Espalhamento (graus, ~500 m) dos restaurantes em volta do centro da localidade
+COORD_NOISE_DEG = 0.005
+
+# Faixas de nota -> cor e texto (limites inferiores, como no dataset real)
+RATING_BINS = [0.1, 2.5, 3.0, 3.5, 4.0, 4.5]
+RATING_COLORS = ['CBCBC8', 'FF7800', 'FFBA00', 'CDD614', '9ACD32', '5BA829', '3F7E00']
+RATING_TEXTS = ['Not rated', 'Poor', 'Average', 'Average', 'Good', 'Very Good', 'Excellent']
+
+FLAG_COLUMNS = ['Has Table booking', 'Has Online delivery', 'Is delivering now', 'Switch to order menu']
+
+# ====================================================================
+# PROFILE (DISTRIBUIÇÕES DO DATASET REAL)
+# ====================================================================
+
+def _grouped_table(frame, group, weight):
+    """
+    Tabela de sorteio por grupo: linhas ordenadas por grupo e chave
+    grupo + fração acumulada do peso dentro do grupo.
+    """
+    frame = frame.sort_values(group, kind='stable').reset_index(drop=True)
+    weights = frame[weight].to_numpy(dtype='float64')
+    groups = frame[group].to_numpy()
+    totals = pd.Series(weights).groupby(groups).transform('sum').to_numpy()
+    fraction = pd.Series(weights / totals).groupby(groups).cumsum().to_numpy()
+    # Último item de cada grupo fecha exatamente em grupo + 1
+    last = np.append(groups[1:] != groups[:-1], True)
+    fraction[last] = 1.0
+    frame['key'] = groups + fraction
+    return frame
+
+def _draw(rng, table, groups):
+    """Sorteia uma linha da tabela para cada grupo pedido (proporcional aos pesos do grupo)."""
+    return np.searchsorted(table['key'].to_numpy(), groups + rng.random(len(groups)), side='right')
+
+def build_profile(raw, rates):
+    """
+    FUNÇÃO DO PERFIL DO DATASET REAL:
+    1. CIDADES (PESO, PAÍS, MOEDA) E LOCALIDADES (PESO E CENTRO lat/long) DE CADA CIDADE
+    2. POR PAÍS: CULINÁRIAS, NOTAS, FAIXAS DE PREÇO, CUSTOS DE CADA FAIXA E FLAGS
+    3. QUANTIDADE DE CULINÁRIAS, VOTOS POR FAIXA DE NOTA (LOG-NORMAL), NOMES
+    4. TAXAS DE VALOR FALTANTE (VIRAM O SENTINELA 'Nan ') E DE LINHAS DUPLICADAS
+
+    INPUT: DATAFRAME BRUTO (CSV), TAXAS DE CÂMBIO
+    OUTPUT: DICT COM AS TABELAS DE SORTEIO
+    """
+    missing = nan_mask(raw).mean()
+    duplicates = float(raw['Restaurant ID'].duplicated().mean())
+
+    raw = raw.loc[raw['Country Code'].isin(list(countries))].dropna(subset=['Cuisines'])
+    raw = raw.loc[~nan_mask(raw).any(axis=1)]
+
+    # O outlier do dataset real (o mesmo de remove_outlier) não entra nas distribuições
+    outlier = raw.loc[raw['Average Cost for two'].idxmax(), 'Restaurant ID']
+    raw = raw.loc[raw['Restaurant ID'] != outlier]
+
+    # Só moedas com taxa de câmbio: o dataset gerado precisa passar por convert_to_dollar
+    unknown = unknown_currencies(raw.rename(columns={'Currency': 'currency'}), rates)
+    if not unknown.empty:
+        raise UnknownCurrencyError(unknown.to_dict())
+
+    country_codes = np.array(sorted(raw['Country Code'].unique()))
+    raw = raw.assign(country=np.searchsorted(country_codes, raw['Country Code']))
+
+    cities = (raw.groupby(['City', 'country'])
+                 .agg(weight=('Restaurant ID', 'size'), currency=('Currency', 'first'))
+                 .reset_index())
+    # Todas as cidades num único grupo de sorteio; 'city' é a linha da cidade na tabela
+    cities = cities.assign(group=0)
+    raw = raw.assign(city=raw.groupby(['City', 'country']).ngroup())
+
+    localities = (raw.groupby(['city', 'Locality'])
+                     .agg(weight=('Restaurant ID', 'size'),
+                          latitude=('Latitude', 'median'),
+                          longitude=('Longitude', 'median'))
+                     .reset_index())
+
+    tags = raw['Cuisines'].str.split(',').explode().str.strip()
+    cuisines = (pd.DataFrame({'country': raw.loc[tags.index, 'country'].to_numpy(), 'cuisine': tags.to_numpy()})
+                  .groupby(['country', 'cuisine']).size().rename('weight').reset_index())
+    n_cuisines = tags.groupby(level=0).size().clip(upper=MAX_CUISINES).value_counts()
+
+    # Custo sorteado entre os valores reais do mesmo país e faixa de preço
+    price = raw.groupby(['country', 'Price range']).size().rename('weight').reset_index()
+    costs = (raw.groupby(['country', 'Price range', 'Average Cost for two']).size().rename('weight').reset_index()
+                .merge(price[['country', 'Price range']].reset_index().rename(columns={'index': 'price'}))
+                .astype({'price': 'int64'}))
+
+    ratings = raw.groupby(['country', 'Aggregate rating']).size().rename('weight').reset_index()
+    log_votes = np.log1p(raw['Votes'])
+    votes = log_votes.groupby(np.floor(raw['Aggregate rating']).astype(int)).agg(['mean', 'std']).fillna(0)
+
+    return {
+        'country_codes': country_codes,
+        'cities': _grouped_table(cities, 'group', 'weight'),
+        'localities': _grouped_table(localities, 'city', 'weight'),
+        'cuisines': _grouped_table(cuisines, 'country', 'weight'),
+        'n_cuisines': (n_cuisines.index.to_numpy(), (n_cuisines / n_cuisines.sum()).to_numpy()),
+        'price': _grouped_table(price, 'country', 'weight'),
+        'costs': _grouped_table(costs, 'price', 'weight'),
+        'ratings': _grouped_table(ratings, 'country', 'weight'),
+        'votes': votes.reindex(range(6)).ffill().fillna(0),
+        'flags': raw.groupby('country')[FLAG_COLUMNS].mean(),
+        'names': raw['Restaurant Name'].value_counts(normalize=True),
+        'missing': missing.loc[missing > 0],
+        'duplicates': duplicates,
+        'columns': list(raw.columns.drop(['country', 'city'])),
+    }
+
+# ====================================================================
+# GENERATION
+# ====================================================================
+
+def _join_cuisines(names, keep):
+    """Lista 'A, B, C' de cada linha a partir da matriz de culinárias sorteadas."""
+    return np.array([', '.join(row[mask]) for row, mask in zip(names, keep)], dtype=object)
+
+def generate_block(profile, rng, first_id, n):
+    """
+    FUNÇÃO DE GERAÇÃO DE UM BLOCO:
+    1. CIDADE -> PAÍS, MOEDA; LOCALIDADE DA CIDADE -> lat/long COM RUÍDO EM VOLTA DO CENTRO
+    2. CULINÁRIAS DISTINTAS (1 A 8) COM AS FREQUÊNCIAS DO PAÍS
+    3. FAIXA DE PREÇO E CUSTO PARA DOIS (VALORES REAIS DO PAÍS/FAIXA); FLAGS DO PAÍS
+    4. NOTA DO PAÍS, VOTOS CONFORME A NOTA, COR E TEXTO DA NOTA
+    5. SENTINELA 'Nan ' E LINHAS DUPLICADAS NAS TAXAS DO DATASET REAL
+
+    INPUT: PERFIL, GERADOR ALEATÓRIO, PRIMEIRO 'Restaurant ID', LINHAS
+    OUTPUT: DATAFRAME COM AS 21 COLUNAS DO CSV
+    """
+    cities = profile['cities']
+    city_rows = _draw(rng, cities, np.zeros(n))
+    city = cities['City'].to_numpy(dtype=object)[city_rows]
+    country = cities['country'].to_numpy()[city_rows]
+
+    localities = profile['localities']
+    locality_rows = _draw(rng, localities, city_rows)
+    locality = localities['Locality'].to_numpy(dtype=object)[locality_rows]
+
+    # Culinárias: sorteia MAX_CUISINES candidatas e fica com as k primeiras distintas
+    table = profile['cuisines']
+    candidates = _draw(rng, table, np.repeat(country, MAX_CUISINES)).reshape(n, MAX_CUISINES)
+    sizes, probabilities = profile['n_cuisines']
+    k = rng.choice(sizes, size=n, p=probabilities)
+    repeated = np.zeros(candidates.shape, dtype=bool)
+    for j in range(1, MAX_CUISINES):
+        repeated[:, j] = (candidates[:, :j] == candidates[:, [j]]).any(axis=1)
+    keep = ~repeated & (np.cumsum(~repeated, axis=1) <= k[:, None])
+    cuisines = _join_cuisines(table['cuisine'].to_numpy(dtype=object)[candidates], keep)
+
+    price_rows = _draw(rng, profile['price'], country)
+    costs = profile['costs']
+    cost = costs['Average Cost for two'].to_numpy()[_draw(rng, costs, price_rows)]
+
+    ratings = profile['ratings']
+    rating = ratings['Aggregate rating'].to_numpy()[_draw(rng, ratings, country)]
+    votes = profile['votes'].iloc[np.floor(rating).astype(int)]
+    bucket = np.digitize(rating, RATING_BINS)
+
+    flags = profile['flags'].to_numpy()[country]
+    numbers = rng.integers(1, 1000, n).astype(str).astype(object)
+    names = profile['names']
+
+    df = pd.DataFrame({
+        'Restaurant ID': np.arange(first_id, first_id + n, dtype='int64'),
+        'Restaurant Name': rng.choice(names.index.to_numpy(dtype=object), size=n, p=names.to_numpy()),
+        'Country Code': profile['country_codes'][country],
+        'City': city,
+        'Address': numbers + ', ' + locality + ', ' + city,
+        'Locality': locality,
+        'Locality Verbose': locality + ', ' + city,
+        'Longitude': localities['longitude'].to_numpy()[locality_rows] + rng.normal(0, COORD_NOISE_DEG, n),
+        'Latitude': localities['latitude'].to_numpy()[locality_rows] + rng.normal(0, COORD_NOISE_DEG, n),
+        'Cuisines': cuisines,
+        'Average Cost for two': cost,
+        'Currency': cities['currency'].to_numpy(dtype=object)[city_rows],
+        **{col: (rng.random(n) < flags[:, i]).astype('int64') for i, col in enumerate(FLAG_COLUMNS)},
+        'Price range': profile['price']['Price range'].to_numpy()[price_rows],
+        'Aggregate rating': rating,
+        'Rating color': np.array(RATING_COLORS, dtype=object)[bucket],
+        'Rating text': np.array(RATING_TEXTS, dtype=object)[bucket],
+        'Votes': np.maximum(np.rint(np.expm1(rng.normal(votes['mean'].to_numpy(), votes['std'].to_numpy()))), 0).astype('int64'),
+    }, columns=profile['columns'])
+
+    # Valores faltantes: o sentinela do CSV original, na taxa de cada coluna
+    for col, rate in profile['missing'].items():
+        df.loc[rng.random(n) < rate, col] = NAN_SENTINEL
+
+    # Duplicatas: cópia de uma linha anterior do mesmo bloco (mesmo 'Restaurant ID')
+    positions = np.arange(n)
+    copies = np.flatnonzero(rng.random(n) < profile['duplicates'])
+    copies = copies[copies > 0]
+    positions[copies] = np.floor(rng.random(len(copies)) * copies).astype('int64')
+    return df.take(positions).reset_index(drop=True)
+
+def generate(rows, seed=0, profile=None):
+    """
+    Gera o dataset em blocos de BLOCK_ROWS linhas (iterador de DataFrames).
+
+    Mesmo seed e mesmo total de linhas produzem sempre os mesmos dados.
+    """
+    if profile is None:
+        profile = build_profile(pd.read_csv(DATASET_PATH), load_rates(RATES_PATH))
+    for block, start in enumerate(range(0, rows, BLOCK_ROWS)):
+        rng = np.random.default_rng([seed, block])
+        yield generate_block(profile, rng, start + 1, min(BLOCK_ROWS, rows - start))
+
+def write_dataset(path, rows, seed=0, profile=None):
+    """
+    FUNÇÃO DE GRAVAÇÃO DO DATASET SINTÉTICO:
+    1. GERA BLOCO A BLOCO (MEMÓRIA CONSTANTE, QUALQUER TAMANHO)
+    2. '.csv': MESMO FORMATO DE dataset/zomato.csv; '.feather'/'.arrow': ARROW IPC EM LOTES
+    3. GRAVA NUM ARQUIVO TEMPORÁRIO E TROCA NO FIM
+
+    Um dataset vazio não serve para o dashboard nem para o benchmark:
+    rows <= 0 levanta ValueError antes de qualquer gravação.
+
+    INPUT: CAMINHO DE SAÍDA, LINHAS (> 0), SEMENTE, PERFIL (OPCIONAL)
+    OUTPUT: CAMINHO GRAVADO
+    """
+    if rows <= 0:
+        raise ValueError(f'O dataset sintético precisa de pelo menos uma linha (rows={rows})')
+
+    columnar = os.path.splitext(path)[1] in ('.feather', '.arrow')
+    if columnar and pa is None:
+        raise ImportError('pyarrow é necessário para gravar em formato colunar')
+
+    tmp_path = path + '.tmp'
+    writer = None
+    try:
+        for number, block in enumerate(generate(rows, seed, profile)):
+            if not columnar:
+                block.to_csv(tmp_path, mode='a' if number else 'w', header=number == 0, index=False)
+                continue
+            batch = pa.Table.from_pandas(block, preserve_index=False)
+            if writer is None:
+                writer = pa.ipc.new_file(tmp_path, batch.schema)
+            writer.write_table(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, path)
+    return path
+
+# ====================================================================
+# CLI: python -m utils.synthetic CAMINHO LINHAS [SEED]
+# ====================================================================
+
+if __name__ == '__main__':
+    import sys
+
+    output = sys.argv[1]
+    n_rows = int(sys.argv[2])
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    print(write_dataset(output, n_rows, seed))